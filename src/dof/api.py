@@ -20,33 +20,60 @@ Key behaviour:
 
 from __future__ import annotations
 
+import codecs
 import csv
+import fnmatch
+import functools
 import hashlib
 import json
 import logging
+import mmap
 import os
+import posixpath
+import re
 import sys
 import tempfile
+import time
 import urllib.parse
+import xml.etree.ElementTree as ET
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from datetime import date
+from datetime import date, datetime
 from enum import Enum
 from pathlib import Path, PurePosixPath
-from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
 from urllib.request import url2pathname
 
 from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.cell.cell import Cell
 from openpyxl.styles import Font, PatternFill
 from openpyxl.utils import get_column_letter
+from openpyxl.utils.cell import coordinate_to_tuple, rows_from_range
 from openpyxl.worksheet.worksheet import Worksheet
 
 from dof import __version__
 
+try:  # optional extra: pip install "treasure-map[blake3]"
+    import blake3 as _blake3
+except ImportError:  # pragma: no cover - exercised by monkeypatching in tests
+    _blake3 = None
+
+try:  # optional extra: pip install "treasure-map[orjson]"
+    import orjson as _orjson
+except ImportError:  # pragma: no cover - exercised by monkeypatching in tests
+    _orjson = None
+
 _logger = logging.getLogger(__name__)
 
 MAIN_SHEET_NAME = "treasure_map"
 META_SHEET_NAME = "_dof_meta"  # hidden; stores fingerprints so we can detect *any* change
+META_COLUMNS = ["Location", "Sha256", "Size", "Mtime"]
+
+HASH_SHA256 = "sha256"
+HASH_BLAKE3 = "blake3"
+BLAKE3_PREFIX = "blake3:"  # SHA-256 fingerprints are stored untagged, as they always were
 
 
 # A pragmatic "document" allowlist. Expand as needed.
@@ -235,23 +262,25 @@ class ScanResult:
         return "\n".join(lines)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class FoundFile:
-    abs_path: Path
+    abs_path: Path  # absolute and resolved
     rel_location: str  # relative to root, POSIX-style
     filename: str
     suffix: str
     file_type: str
     sha256: Optional[str]
     size: Optional[int] = None
+    mtime_ns: Optional[int] = None  # None when unreadable or too recent to trust next scan
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class MetaEntry:
     """Per-file fingerprint stored on the hidden meta sheet."""
 
     sha256: Optional[str] = None  # SHA-256 of the content, None when it could not be read
     size: Optional[int] = None  # size in bytes, None when it could not be read
+    mtime_ns: Optional[int] = None  # modification time the hash was taken at, None if untrusted
 
 
 @dataclass(frozen=True)
@@ -267,31 +296,29 @@ def _safe_save_workbook(wb, dest: Path) -> Path:
 
     Writes to a temp file first, then attempts atomic replace.
     If destination is locked (e.g., open in Excel / OneDrive lock), writes to *.NEW.xlsx.
+    ``dest`` is expected to be absolute already (callers resolve it once).
     """
-    dest = dest.resolve()
     dest.parent.mkdir(parents=True, exist_ok=True)
 
-    fd, tmp_name = tempfile.mkstemp(prefix=dest.stem + ".", suffix=".tmp.xlsx", dir=str(dest.parent))
+    fd, tmp_name = tempfile.mkstemp(prefix=dest.stem + ".", suffix=".tmp.xlsx", dir=dest.parent)
     os.close(fd)
-    tmp_path = Path(tmp_name)
 
     try:
-        wb.save(tmp_path)
+        wb.save(tmp_name)
 
         try:
-            tmp_path.replace(dest)  # atomic on same filesystem
+            os.replace(tmp_name, dest)  # atomic on same filesystem
             return dest
         except PermissionError:
             alt = dest.with_name(dest.stem + ".NEW" + dest.suffix)
-            tmp_path.replace(alt)
+            os.replace(tmp_name, alt)
             return alt
     finally:
         # Cleanup if anything went wrong and tmp still exists
-        if tmp_path.exists():
-            try:
-                tmp_path.unlink()
-            except OSError:
-                pass
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
 
 
 def setup_logging(loglevel: Optional[int]) -> None:
@@ -307,11 +334,81 @@ def _posix_relpath(path: Path, root: Path) -> str:
     return rel.as_posix()
 
 
+def _suffix_of(name: str) -> str:
+    """Lower-cased ``Path(name).suffix``, without building a Path."""
+    i = name.rfind(".")
+    return name[i:].lower() if 0 < i < len(name) - 1 else ""
+
+
+def _list_dir(path: str) -> Tuple[List[os.DirEntry[str]], List[str]]:
+    """Return (non-directory entries, subdirectory paths) of one directory.
+
+    Symlinked directories count as files, not subdirectories, and an unreadable
+    directory lists as empty, as with ``Path.walk()``.
+    """
+    try:
+        with os.scandir(path) as it:
+            entries = list(it)
+    except OSError:
+        return [], []
+    files: List[os.DirEntry[str]] = []
+    subdirs: List[str] = []
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir(follow_symlinks=False)
+        except OSError:
+            is_dir = False
+        if is_dir:
+            subdirs.append(entry.path)
+        else:
+            files.append(entry)
+    return files, subdirs
+
+
+def _walk_files(top: str, prune: Optional[Callable[[str], bool]] = None) -> Iterator[os.DirEntry[str]]:
+    """Yield every non-directory entry below ``top``, top-down in ``Path.walk()`` order.
+
+    The entries keep ``os.scandir``'s cached type and stat data. Subdirectories whose
+    path satisfies ``prune`` are not entered.
+    """
+    stack = [top]
+    while stack:
+        files, subdirs = _list_dir(stack.pop())
+        yield from files
+        if prune is not None:
+            subdirs = [d for d in subdirs if not prune(d)]
+        stack.extend(reversed(subdirs))
+
+
+def _walk_files_parallel(
+    top: str, workers: int, prune: Optional[Callable[[str], bool]] = None
+) -> Iterator[os.DirEntry[str]]:
+    """Like :func:`_walk_files`, but each top-level subdirectory is walked on its own thread.
+
+    Listing a directory is mostly ``scandir`` system calls, which release the GIL, so
+    subtrees on slow or network-synced storage overlap. Entries are yielded in the same
+    order as :func:`_walk_files`.
+    """
+    files, subdirs = _list_dir(top)
+    yield from files
+    if prune is not None:
+        subdirs = [d for d in subdirs if not prune(d)]
+    if workers <= 1 or len(subdirs) <= 1:
+        for subdir in subdirs:
+            yield from _walk_files(subdir, prune)
+        return
+    with ThreadPoolExecutor(max_workers=min(workers, len(subdirs))) as pool:
+        for subtree in pool.map(lambda d: list(_walk_files(d, prune)), subdirs):
+            yield from subtree
+
+
 def _is_document(path: Path, suffixes: Iterable[str]) -> bool:
     return path.is_file() and path.suffix.lower() in suffixes
 
 
+@functools.lru_cache(maxsize=128)
 def _infer_file_type(suffix: str) -> str:
+    # A scan sees only a handful of distinct suffixes, so each is resolved once.
     s = suffix.lower()
     if s in FILE_TYPE_BY_SUFFIX:
         return FILE_TYPE_BY_SUFFIX[s]
@@ -319,68 +416,188 @@ def _infer_file_type(suffix: str) -> str:
     return s.lstrip(".").upper() if s else "UNKNOWN"
 
 
+def _new_sha256() -> "hashlib._Hash":
+    # The hash is a change-detection fingerprint, not a security control. Saying so lets
+    # FIPS-mode OpenSSL builds hash without the approved-use bookkeeping.
+    return hashlib.sha256(usedforsecurity=False)
+
+
+def _sha256_backend() -> str:
+    """Name the SHA-256 implementation: ``openssl`` (SHA-NI/ARMv8 capable) or ``builtin``."""
+    return "openssl" if hashlib.sha256.__module__ == "_hashlib" else "builtin"
+
+
+# Files at least this big are hashed through a read-only memory map: the hash reads the
+# page cache directly instead of copying every chunk into a Python buffer. Below it, the
+# cost of setting up the mapping outweighs the copy saved.
+MMAP_HASH_THRESHOLD = 8 * 1024 * 1024
+
+
 def _sha256_file(path: Path, chunk_size: int = 1024 * 1024) -> str:
-    h = hashlib.sha256()
+    # chunk_size is kept for backward compatibility only: file_digest runs the whole
+    # read/update loop in C with its own buffer, releasing the GIL while it hashes.
     with path.open("rb") as f:
-        while True:
-            chunk = f.read(chunk_size)
-            if not chunk:
-                break
-            h.update(chunk)
-    return h.hexdigest()
+        if os.fstat(f.fileno()).st_size >= MMAP_HASH_THRESHOLD:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                mm = None  # e.g. network shares and cloud placeholders; read instead
+            if mm is not None:
+                with mm:
+                    if hasattr(mmap, "MADV_SEQUENTIAL"):  # not on Windows
+                        mm.madvise(mmap.MADV_SEQUENTIAL)
+                    h = _new_sha256()
+                    h.update(mm)
+                    return h.hexdigest()
+        return hashlib.file_digest(f, _new_sha256).hexdigest()
+
+
+# BLAKE3 can hash one file on several threads (its tree mode). Below this size the
+# thread start-up costs more than it saves, and the scan already hashes files in parallel.
+BLAKE3_MULTITHREAD_THRESHOLD = 64 * 1024 * 1024
+
+
+def _blake3_file(path: Path) -> str:
+    if _blake3 is None:
+        raise RuntimeError("BLAKE3 fingerprints need the optional 'blake3' package")
+    hasher = _blake3.blake3()
+    if path.stat().st_size > BLAKE3_MULTITHREAD_THRESHOLD:
+        hasher = _blake3.blake3(max_threads=_blake3.blake3.AUTO)
+    return BLAKE3_PREFIX + hasher.update_mmap(path).hexdigest()
+
+
+def _hash_algorithm_of(fingerprint: Optional[str]) -> Optional[str]:
+    """Return the algorithm a stored fingerprint was computed with, or None if unknown."""
+    if fingerprint is None:
+        return None
+    return HASH_BLAKE3 if fingerprint.startswith(BLAKE3_PREFIX) else HASH_SHA256
+
+
+def _content_hash_file(path: Path, algorithm: str = HASH_SHA256) -> str:
+    if algorithm == HASH_BLAKE3:
+        return _blake3_file(path)
+    return _sha256_file(path)
 
 
-def _safe_sha256_file(path: Path) -> Optional[str]:
-    """Best-effort SHA-256.
+def _safe_content_hash(path: Path, algorithm: str = HASH_SHA256) -> Optional[str]:
+    """Best-effort content fingerprint.
 
     OneDrive/Excel can temporarily lock files or expose cloud placeholders that
     raise PermissionError/OSError. In those cases we return None so the scan
     can continue without incorrectly bumping versions.
     """
     try:
-        return _sha256_file(path)
+        return _content_hash_file(path, algorithm)
     except (PermissionError, OSError):
         return None
 
 
-def _safe_file_size(path: Path) -> Optional[int]:
-    """Best-effort file size in bytes.
+def _select_hash_algorithm(meta: Dict[str, MetaEntry]) -> str:
+    """Choose the fingerprint algorithm for a scan against ``meta``.
+
+    A workbook keeps the algorithm it was created with, so hashes stay comparable for
+    change and move detection. A new workbook uses BLAKE3 when the optional package is
+    installed. A workbook holding any SHA-256 fingerprint stays on SHA-256, which every
+    machine can compute; a BLAKE3 workbook opened without the package falls back to
+    SHA-256, and content changes cannot be detected for that one run.
+
+    Parameters
+    ----------
+    meta : dict
+        Fingerprints read from the existing workbook, keyed by location.
+
+    Returns
+    -------
+    str
+        ``HASH_SHA256`` or ``HASH_BLAKE3``.
+    """
+    used = {_hash_algorithm_of(entry.sha256) for entry in meta.values() if entry.sha256 is not None}
+    if not used:
+        return HASH_BLAKE3 if _blake3 is not None else HASH_SHA256
+    if HASH_SHA256 in used:
+        return HASH_SHA256
+    if _blake3 is None:
+        _logger.warning(
+            "Treasure map uses BLAKE3 fingerprints but the 'blake3' package is not installed. "
+            "Falling back to SHA-256; content changes cannot be detected on this run."
+        )
+        return HASH_SHA256
+    return HASH_BLAKE3
+
+
+def _safe_stat(path: Path | os.DirEntry[str]) -> Optional[os.stat_result]:
+    """Best-effort ``stat()``.
 
-    Mirrors :func:`_safe_sha256_file`: OneDrive placeholders and Windows file locks
+    Mirrors :func:`_safe_content_hash`: OneDrive placeholders and Windows file locks
     can raise ``PermissionError``/``OSError``, in which case we return ``None`` rather
     than aborting the scan.
 
     Parameters
     ----------
-    path : pathlib.Path
-        File to stat.
+    path : pathlib.Path or os.DirEntry
+        File to stat. A ``DirEntry`` from ``os.scandir`` caches its result.
 
     Returns
     -------
-    int or None
-        Size in bytes, or ``None`` when it cannot be determined.
+    os.stat_result or None
+        The stat result, or ``None`` when it cannot be determined.
     """
     try:
-        return path.stat().st_size
+        return path.stat()
     except (PermissionError, OSError):
         return None
 
 
+# A file modified this close to the start of a scan may be modified again within the
+# same mtime tick (2 s on FAT), so its mtime is not recorded and it is re-hashed next
+# time. This is git's "racily clean" rule.
+_RACY_MTIME_WINDOW_NS = 2_000_000_000
+
+
+def _reusable_hash(entry: Optional[MetaEntry], st: Optional[os.stat_result], algorithm: str) -> Optional[str]:
+    """Return the stored hash when size and mtime prove the file is unchanged.
+
+    Parameters
+    ----------
+    entry : MetaEntry or None
+        Fingerprint recorded by the previous scan for this location.
+    st : os.stat_result or None
+        Current stat of the file.
+    algorithm : str
+        Algorithm this scan fingerprints with; a hash taken with another is not reused.
+
+    Returns
+    -------
+    str or None
+        The previously recorded hash, or ``None`` when the file must be re-hashed.
+    """
+    if entry is None or st is None or entry.sha256 is None or entry.mtime_ns is None:
+        return None
+    if entry.size != st.st_size or entry.mtime_ns != st.st_mtime_ns:
+        return None
+    if _hash_algorithm_of(entry.sha256) != algorithm:
+        return None
+    return entry.sha256
+
+
 def _hash_changed(old: Optional[str], new: Optional[str]) -> bool:
     """Return True only when we can *prove* a content change.
 
     - If we can't read/hash the file now (new is None), we do not claim change.
     - If we couldn't hash it previously (old is None) but can now, treat as no change
       (metadata improvement only).
+    - Fingerprints taken with different algorithms are not comparable: no change.
     """
     if new is None:
         return False
     if old is None:
         return False
+    if _hash_algorithm_of(old) != _hash_algorithm_of(new):
+        return False
     return old != new
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class IgnoreRule:
     pattern: str
     negated: bool = False
@@ -397,167 +614,331 @@ def _load_treasureignore(root_dir: Path) -> Optional[List[IgnoreRule]]:
     - patterns with no / match anywhere (we also try **/pattern)
     - patterns starting with / match only at root level
     - patterns ending with / ignore that directory and everything under it
-    - ** is supported via PurePosixPath.match
+    - ** is supported with PurePosixPath.match semantics
+    - the file is read as UTF-8; a UTF-8 or UTF-16 byte-order mark is honoured
+
+    Parsing is memoized on the file's text, so repeated loads during one scan
+    only cost a read.
     """
     ignore_path = root_dir / ".treasureignore"
     if not ignore_path.exists() or not ignore_path.is_file():
         return None
 
-    rules: List[IgnoreRule] = []
     try:
-        for raw in ignore_path.read_text(encoding="utf-8", errors="replace").splitlines():
-            line = raw.strip()
+        data = ignore_path.read_bytes()
+    except OSError:
+        return None
+    # Editors on Windows may save with a byte-order mark; "utf-16" reads its BOM.
+    encoding = "utf-16" if data.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)) else "utf-8-sig"
+    text = data.decode(encoding, errors="replace")
+
+    rules = _parse_treasureignore(text)
+    return list(rules) or None
+
+
+@functools.lru_cache(maxsize=16)
+def _parse_treasureignore(text: str) -> Tuple[IgnoreRule, ...]:
+    rules: List[IgnoreRule] = []
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+        if line.startswith("#"):
+            continue
+
+        neg = line.startswith("!")
+        if neg:
+            line = line[1:].strip()
             if not line:
                 continue
-            if line.startswith("#"):
+
+        # root-anchored patterns start with /
+        root_anchored = line.startswith("/")
+        if root_anchored:
+            line = line[1:]
+
+        dir_only = line.endswith("/")
+        if dir_only:
+            line = line[:-1].strip()
+            if not line:
                 continue
 
-            neg = line.startswith("!")
-            if neg:
-                line = line[1:].strip()
-                if not line:
-                    continue
+        rules.append(IgnoreRule(pattern=line, negated=neg, dir_only=dir_only, root_anchored=root_anchored))
+    return tuple(rules)
 
-            # root-anchored patterns start with /
-            root_anchored = line.startswith("/")
-            if root_anchored:
-                line = line[1:]
 
-            dir_only = line.endswith("/")
-            if dir_only:
-                line = line[:-1].strip()
-                if not line:
-                    continue
+# Rule regexes run against the path with "/" and "\n" swapped, the same trick
+# PurePath.match uses: without re.DOTALL, fnmatch's "*" and "?" then stop at a
+# path separator. fnmatch.translate() wraps its output in "(?s:" ... ")\Z",
+# which is sliced off so segments can be joined.
+_FNMATCH_PREFIX, _FNMATCH_SUFFIX = fnmatch.translate("_").split("_")
+_FNMATCH_SLICE = slice(len(_FNMATCH_PREFIX), -len(_FNMATCH_SUFFIX))
+_SWAP_SEP_AND_NEWLINE = str.maketrans({"/": "\n", "\n": "/"})
+_ANY_PARENTS = r"(?:(?s:.*)\n)?"
+_ANY_CHILDREN = r"(?:\n(?s:.*))?\Z"
 
-            rules.append(IgnoreRule(pattern=line, negated=neg, dir_only=dir_only, root_anchored=root_anchored))
-    except OSError:
+
+@functools.lru_cache(maxsize=None)
+def _rule_regex(rule: IgnoreRule) -> Optional[re.Pattern[str]]:
+    """Compile ``rule`` once into a regex equivalent to the old PurePosixPath.match checks.
+
+    Returns None for a rule that can never match (an empty or absolute pattern).
+    """
+    if rule.pattern.startswith("/"):
         return None
+    segments = [s for s in rule.pattern.split("/") if s and s != "."]
+    dir_from_root = rule.dir_only and (rule.root_anchored or "/" in rule.pattern)
+    if not segments:
+        # "/./" still matched "pat/**", i.e. everything
+        return re.compile(_ANY_PARENTS + r".*\Z") if dir_from_root else None
+    body = "\n".join(".+" if s == "*" else fnmatch.translate(s)[_FNMATCH_SLICE] for s in segments)
+
+    if rule.root_anchored and not rule.dir_only:
+        # Root-anchored file/pattern: must match at root level (no / in rel_posix)
+        if len(segments) > 1:
+            return None
+        return re.compile(r"(?=[^\n]*\Z)" + body + r"\Z")
+
+    if dir_from_root:
+        # the directory itself, or one path component below it ("pat/**")
+        return re.compile(_ANY_PARENTS + body + r"(?:\n.*)?\Z")
 
-    return rules or None
+    if rule.dir_only:
+        # directory name anywhere in the path, and everything under it
+        return re.compile(_ANY_PARENTS + body + _ANY_CHILDREN)
+
+    # patterns with a slash match from the right; basename-style patterns match anywhere
+    return re.compile(_ANY_PARENTS + body + r"\Z")
 
 
 def _rule_matches(rel_posix: str, rule: IgnoreRule) -> bool:
-    p = PurePosixPath(rel_posix)
-    pat = rule.pattern
-
-    # Root-anchored patterns only match at the root level (no parent directories)
-    if rule.root_anchored:
-        if rule.dir_only:
-            # Root-anchored directory pattern: must match at root and be a directory
-            return p.match(pat + "/**") or p.match(pat)
-        # Root-anchored file/pattern: must match at root level (no / in rel_posix)
-        return "/" not in rel_posix and p.match(pat)
+    regex = _rule_regex(rule)
+    return regex is not None and regex.match(rel_posix.translate(_SWAP_SEP_AND_NEWLINE)) is not None
 
-    if rule.dir_only:
-        # match any path under that directory; treat pattern as a path fragment
-        # e.g. "tmp/" matches "tmp/a.pdf" and "a/tmp/b.pdf" when pattern has no "/".
-        if "/" in pat:
-            return p.match(pat + "/**") or p.match(pat)
-        # directory name anywhere in the path
-        for i in range(1, len(p.parts) + 1):
-            prefix = PurePosixPath(*p.parts[:i])
-            if prefix.match(pat):
-                # ensure it's actually a directory boundary: prefix shorter than full path
-                return True
-        return False
 
-    if "/" in pat:
-        return p.match(pat)
+def _ignore_matcher(rules: Optional[List[IgnoreRule]]) -> Callable[[str], bool]:
+    """Combine ``rules`` into one regex and return a ``rel_posix -> ignored`` predicate.
+
+    Each rule becomes one capturing alternative, last rule first, so the alternative that
+    matches is the last matching rule ("last match wins") and its group number tells
+    whether that rule was a negation.
+    """
+    alternatives: List[str] = []
+    negated_by_group: Dict[int, bool] = {}
+    group = 1
+    for rule in reversed(rules or []):
+        regex = _rule_regex(rule)
+        if regex is None:
+            continue
+        alternatives.append(f"({regex.pattern})")
+        negated_by_group[group] = rule.negated
+        group += 1 + regex.groups
+    if not alternatives:
+        return lambda rel_posix: False
 
-    # basename-style patterns should match anywhere
-    return p.match(pat) or p.match("**/" + pat)
+    combined = re.compile("|".join(alternatives))
+
+    def is_ignored(rel_posix: str) -> bool:
+        m = combined.match(rel_posix.translate(_SWAP_SEP_AND_NEWLINE))
+        return m is not None and not negated_by_group[m.lastindex or 0]
+
+    return is_ignored
 
 
 def _is_ignored(rel_posix: str, rules: Optional[List[IgnoreRule]]) -> bool:
-    if not rules:
-        return False
-    ignored = False
-    for r in rules:
-        if _rule_matches(rel_posix, r):
-            ignored = not r.negated
-    return ignored
+    return _ignore_matcher(rules)(rel_posix)
+
+
+def _ignored_dir_matcher(rules: Optional[List[IgnoreRule]]) -> Optional[Callable[[str], bool]]:
+    """Return a ``rel_posix -> prune`` predicate for directories, or None if none can be pruned.
+
+    A directory is pruned only when every path below it is certainly ignored: it matches
+    a ``name/`` rule (one without a ``/`` inside) that no later ``!`` rule can override.
+    Rules with a ``/`` are left to the per-file check, since they only cover one level
+    below the directory.
+    """
+    rules = list(rules or [])
+    last_negation = max((i for i, r in enumerate(rules) if r.negated), default=-1)
+    alternatives: List[str] = []
+    for rule in rules[last_negation + 1 :]:
+        if not rule.dir_only or rule.root_anchored or "/" in rule.pattern:
+            continue
+        regex = _rule_regex(rule)
+        if regex is None:
+            continue
+        # the directory itself must match, so drop the "and anything under it" tail
+        alternatives.append(regex.pattern.removesuffix(_ANY_CHILDREN) + r"\Z")
+    if not alternatives:
+        return None
+
+    combined = re.compile("|".join(f"(?:{a})" for a in alternatives))
+    return lambda rel_posix: combined.match(rel_posix.translate(_SWAP_SEP_AND_NEWLINE)) is not None
+
+
+# Characters urllib.parse.quote never escapes, plus the "/" between segments.
+_URL_SAFE_PATH = re.compile(r"[\w.~/-]*", re.ASCII)
+
+
+@functools.lru_cache(maxsize=1024)
+def _quoted_dir(rel_dir_posix: str) -> str:
+    # Files in one folder share its quoted form, so each directory is quoted once.
+    return "/".join(urllib.parse.quote(p) for p in rel_dir_posix.split("/"))
 
 
 def _build_sharepoint_url(base: Optional[str], rel_location_posix: str, abs_path: Path) -> str:
     """Create a hyperlink target.
 
     If base is provided, treat it as a SharePoint/OneDrive base URL and append rel path.
-    Otherwise, fall back to a local file:// URI.
+    Otherwise, fall back to a local file:// URI of ``abs_path``, which must already be
+    absolute and resolved, as :func:`discover_documents` returns it.
     """
     if base:
         # Preserve existing querystring/fragments on base; append path.
         # Use urllib for safe quoting of path segments.
         base = base.rstrip("/")
+        # Most locations need no escaping at all; one regex check skips per-segment quoting.
+        if _URL_SAFE_PATH.fullmatch(rel_location_posix):
+            return base + "/" + rel_location_posix
         # SharePoint URLs are typically already encoded; we encode the rel path safely.
-        rel_parts = [urllib.parse.quote(p) for p in rel_location_posix.split("/")]
-        return base + "/" + "/".join(rel_parts)
-    return abs_path.resolve().as_uri()
+        parent, sep, name = rel_location_posix.rpartition("/")
+        return base + "/" + (_quoted_dir(parent) + sep if sep else "") + urllib.parse.quote(name)
+    return abs_path.as_uri()
+
+
+def _default_hash_workers() -> int:
+    """Thread count for hashing: I/O-bound, so oversubscribe the cores a little."""
+    return min(32, (os.cpu_count() or 4) * 2)
 
 
 def discover_documents(
     root_dir: Path,
     suffixes: Optional[Iterable[str]] = None,
     progress_callback: Optional[Callable[[str], None]] = None,
+    max_workers: Optional[int] = None,
+    known: Optional[Dict[str, MetaEntry]] = None,
+    hash_algorithm: str = HASH_SHA256,
+    ignore_rules: Optional[List[IgnoreRule]] = None,
 ) -> List[FoundFile]:
     """Recursively scan root_dir for document files.
 
-    Respects an optional .treasureignore in root_dir, using gitignore-style patterns.
-    Uses Path.walk() for efficient directory traversal (Python 3.12+).
+    Respects an optional .treasureignore in root_dir, using gitignore-style patterns;
+    directories that a ``name/`` rule ignores outright are not walked at all.
+    Walks the tree with os.scandir, one thread per top-level subdirectory, filtering on
+    names and cached entry types so only candidate documents cost a stat call. Files
+    are hashed on a thread pool: hashlib releases the GIL while it digests, so reads
+    and hashing of different files overlap.
 
     Args:
         root_dir: Directory to scan.
         suffixes: File extensions to include (defaults to DEFAULT_DOCUMENT_SUFFIXES).
         progress_callback: Optional callback called with each file path being processed.
+        max_workers: Walking and hashing threads; ``None`` picks a default from the CPU
+            count and ``1`` does everything sequentially on the calling thread.
+        known: Fingerprints from a previous scan, keyed by location. A file whose size
+            and modification time both match its entry reuses the stored hash instead
+            of being read again.
+        hash_algorithm: ``HASH_SHA256`` (the default) or ``HASH_BLAKE3``; BLAKE3
+            fingerprints are stored with a ``blake3:`` prefix.
+        ignore_rules: Rules already loaded from root_dir's .treasureignore (an empty
+            list for none); ``None`` loads them here.
     """
     suffixes_set = set(s.lower() for s in (suffixes or DEFAULT_DOCUMENT_SUFFIXES))
-    ignore_rules = _load_treasureignore(root_dir)
+    # str.endswith(tuple) rejects most non-documents in one C call; the set check then
+    # applies Path.suffix's rules (e.g. a bare ".pdf" dotfile has no suffix).
+    suffix_tuple = tuple(sorted(suffixes_set))
+    # Resolve once so every abs_path below is absolute and canonical without a per-file resolve().
+    root_dir = root_dir.resolve()
+    rules = ignore_rules if ignore_rules is not None else _load_treasureignore(root_dir)
+    is_ignored = _ignore_matcher(rules)
 
-    found: List[FoundFile] = []
+    candidates: List[Tuple[Path, str, str, str]] = []
+    stats: List[Optional[os.stat_result]] = []
 
-    # Use Path.walk() (Python 3.12+) for more efficient traversal
-    for dirpath, _dirnames, filenames in root_dir.walk():
-        for filename in filenames:
-            # Always ignore the ignore file itself
-            if filename == ".treasureignore":
-                continue
+    workers = max_workers if max_workers is not None else _default_hash_workers()
+    top = str(root_dir)
+    prefix = os.path.join(top, "")
+    ignored_dir = _ignored_dir_matcher(rules)
 
-            p = dirpath / filename
-            suffix = p.suffix.lower()
-            if suffix not in suffixes_set:
-                continue
+    def prune(path: str) -> bool:
+        return ignored_dir is not None and ignored_dir(path[len(prefix) :].replace(os.sep, "/"))
 
-            rel = _posix_relpath(p, root_dir)
-            if _is_ignored(rel, ignore_rules):
-                continue
+    for entry in _walk_files_parallel(top, workers, prune if ignored_dir is not None else None):
+        filename = entry.name
+        # Always ignore the ignore file itself
+        if filename == ".treasureignore":
+            continue
 
-            if progress_callback:
-                progress_callback(rel)
-
-            found.append(
-                FoundFile(
-                    abs_path=p,
-                    rel_location=rel,
-                    filename=filename,
-                    suffix=suffix,
-                    file_type=_infer_file_type(suffix),
-                    sha256=_safe_sha256_file(p),
-                    size=_safe_file_size(p),
-                )
+        if not filename.lower().endswith(suffix_tuple):
+            continue
+        suffix = _suffix_of(filename)
+        if suffix not in suffixes_set:
+            continue
+
+        if entry.is_symlink():
+            rel = _posix_relpath(Path(entry.path), root_dir)
+            p = root_dir / rel  # the resolved target, like every other abs_path
+        else:
+            p = Path(entry.path)
+            rel = entry.path[len(prefix) :].replace(os.sep, "/")
+        if is_ignored(rel):
+            continue
+
+        if progress_callback:
+            progress_callback(rel)
+
+        candidates.append((p, rel, filename, suffix))
+        stats.append(_safe_stat(entry))
+
+    known = known or {}
+    racy_cutoff = time.time_ns() - _RACY_MTIME_WINDOW_NS
+    hashes = [_reusable_hash(known.get(c[1]), st, hash_algorithm) for c, st in zip(candidates, stats, strict=True)]
+
+    to_hash = [i for i, sha in enumerate(hashes) if sha is None]
+    paths = [candidates[i][0] for i in to_hash]
+    if workers > 1 and len(paths) > 1:
+        with ThreadPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+            fresh = list(pool.map(_safe_content_hash, paths, [hash_algorithm] * len(paths)))
+    else:
+        fresh = [_safe_content_hash(p, hash_algorithm) for p in paths]
+    for i, sha in zip(to_hash, fresh, strict=True):
+        hashes[i] = sha
+
+    found: List[FoundFile] = []
+    for (p, rel, filename, suffix), st, sha in zip(candidates, stats, hashes, strict=True):
+        mtime_ns = st.st_mtime_ns if st is not None and sha is not None else None
+        if mtime_ns is not None and mtime_ns >= racy_cutoff:
+            mtime_ns = None
+        found.append(
+            FoundFile(
+                abs_path=p,
+                rel_location=rel,
+                filename=filename,
+                suffix=suffix,
+                file_type=_infer_file_type(suffix),
+                sha256=sha,
+                size=st.st_size if st is not None else None,
+                mtime_ns=mtime_ns,
             )
+        )
 
     # deterministic order helps tests and diffing
     found.sort(key=lambda x: x.rel_location.lower())
     return found
 
 
-def _ensure_required_headers(ws: Worksheet) -> Dict[str, int]:
-    """Return a mapping column_name -> 1-based column index, ensuring headers exist."""
-    header_row = 1
-    existing = [c.value for c in ws[header_row]]
+def _header_mapping(header: Sequence[object]) -> Dict[str, int]:
+    """Map each non-blank header name to its 1-based column index."""
     mapping: Dict[str, int] = {}
-    for idx, name in enumerate(existing, start=1):
+    for idx, name in enumerate(header, start=1):
         if isinstance(name, str) and name.strip():
             mapping[name.strip()] = idx
+    return mapping
+
+
+def _ensure_required_headers(ws: Worksheet) -> Dict[str, int]:
+    """Return a mapping column_name -> 1-based column index, ensuring headers exist."""
+    header_row = 1
+    mapping = _header_mapping([c.value for c in ws[header_row]])
 
     # Create headers if sheet is empty or missing required columns.
     if not mapping:
@@ -575,146 +956,272 @@ def _ensure_required_headers(ws: Worksheet) -> Dict[str, int]:
     return mapping
 
 
-def _style_header(ws: Worksheet, mapping: Dict[str, int]) -> None:
+def _style_header(ws: Worksheet, mapping: Dict[str, int]) -> bool:
+    """Bold the required headers and freeze the header row; True if anything changed."""
     font = Font(bold=True)
+    changed = False
     for name, col in mapping.items():
         if name in REQUIRED_COLUMNS:
-            ws.cell(row=1, column=col).font = font
-    ws.freeze_panes = "A2"
-
-
-def _autosize_columns(ws: Worksheet, mapping: Dict[str, int], max_width: int = 80) -> None:
-    # crude autosize based on max string length in each column
-    for name, col in mapping.items():
-        if name not in REQUIRED_COLUMNS:
-            continue
-        max_len = len(name)
-        for row in range(2, ws.max_row + 1):
-            v = ws.cell(row=row, column=col).value
-            if v is None:
-                continue
-            v_str = str(v)
-            max_len = max(max_len, len(v_str))
-        ws.column_dimensions[get_column_letter(col)].width = min(max_len + 2, max_width)
-
-
-def _load_or_create_workbook(output_xlsx: Path) -> Tuple[Workbook, Worksheet, Worksheet]:
-    """Load an existing workbook if possible, otherwise create a new one.
-
-    Returns (wb, main_ws, meta_ws).
+            c = ws.cell(row=1, column=col)
+            if c.font != font:
+                c.font = font
+                changed = True
+    if ws.freeze_panes != "A2":
+        ws.freeze_panes = "A2"
+        changed = True
+    return changed
+
+
+def _load_existing_workbook(output_xlsx: Path) -> Optional[Tuple[Workbook, Worksheet, Worksheet, bool]]:
+    """Load an existing workbook for an in-place update.
+
+    Returns (wb, main_ws, meta_ws, sheets_added), or None if the file cannot be opened;
+    the caller then writes a new workbook instead. ``sheets_added`` is True when the
+    main sheet had to be renamed or the meta sheet created.
     """
-    if output_xlsx.exists():
-        try:
-            wb = load_workbook(output_xlsx)
-        except PermissionError:
-            _logger.warning(
-                "Cannot open %s (locked/open in Excel). Cannot preserve existing Description values.",
-                output_xlsx,
-            )
-            wb = Workbook()
-            ws = wb.active
-            ws.title = MAIN_SHEET_NAME
-            meta_ws = wb.create_sheet(META_SHEET_NAME)
-            meta_ws.sheet_state = "hidden"
-            return wb, ws, meta_ws
-
-        # Main sheet
-        if MAIN_SHEET_NAME in wb.sheetnames:
-            ws = wb[MAIN_SHEET_NAME]
-        else:
-            ws = wb.active
-            ws.title = MAIN_SHEET_NAME
+    try:
+        wb = load_workbook(output_xlsx)
+    except PermissionError:
+        _logger.warning(
+            "Cannot open %s (locked/open in Excel). Cannot preserve existing Description values.",
+            output_xlsx,
+        )
+        return None
 
-        # Meta sheet
-        if META_SHEET_NAME in wb.sheetnames:
-            meta_ws = wb[META_SHEET_NAME]
-        else:
-            meta_ws = wb.create_sheet(META_SHEET_NAME)
-            meta_ws.sheet_state = "hidden"
+    sheets_added = not {MAIN_SHEET_NAME, META_SHEET_NAME} <= set(wb.sheetnames)
 
-        return wb, ws, meta_ws
+    # Main sheet
+    if MAIN_SHEET_NAME in wb.sheetnames:
+        ws = wb[MAIN_SHEET_NAME]
+    else:
+        ws = wb.active
+        ws.title = MAIN_SHEET_NAME
 
-    # New workbook
-    wb = Workbook()
-    ws = wb.active
-    ws.title = MAIN_SHEET_NAME
-    meta_ws = wb.create_sheet(META_SHEET_NAME)
-    meta_ws.sheet_state = "hidden"
-    return wb, ws, meta_ws
+    # Meta sheet
+    if META_SHEET_NAME in wb.sheetnames:
+        meta_ws = wb[META_SHEET_NAME]
+    else:
+        meta_ws = wb.create_sheet(META_SHEET_NAME)
+        meta_ws.sheet_state = "hidden"
+
+    return wb, ws, meta_ws, sheets_added
 
 
 def _read_existing_rows(ws: Worksheet, mapping: Dict[str, int]) -> Dict[str, Dict[str, object]]:
     """Return existing rows keyed by Location (relative path)."""
-    rows: Dict[str, Dict[str, object]] = {}
-    loc_col = mapping["Location"]
-
-    for r in range(2, ws.max_row + 1):
-        loc = ws.cell(row=r, column=loc_col).value
-        if not loc:
-            continue
-        loc_str = str(loc)
-        row_data: Dict[str, object] = {"__row": r}
-        for name in REQUIRED_COLUMNS:
-            row_data[name] = ws.cell(row=r, column=mapping[name]).value
-        # preserve hyperlink target (openpyxl stores it on the cell)
-        link_cell = ws.cell(row=r, column=mapping["Link"])
-        if link_cell.hyperlink:
-            row_data["__link_target"] = link_cell.hyperlink.target
-        rows[loc_str] = row_data
-    return rows
+    # preserve hyperlink targets (openpyxl stores them on the cell); one pass over Link only
+    link_col = mapping["Link"]
+    link_targets = {
+        cell.row: cell.hyperlink.target
+        for (cell,) in ws.iter_rows(min_row=2, min_col=link_col, max_col=link_col)
+        if cell.hyperlink
+    }
+    return _rows_from_values(ws.iter_rows(min_row=2, values_only=True), mapping, link_targets)
 
 
 def _meta_headers(meta_ws: Worksheet) -> Dict[str, int]:
-    mapping = {}
+    mapping: Dict[str, int] = {}
     if meta_ws.max_row >= 1:
-        existing = [c.value for c in meta_ws[1]]
-        for idx, v in enumerate(existing, start=1):
-            if isinstance(v, str) and v.strip():
-                mapping[v.strip()] = idx
+        mapping = _header_mapping([c.value for c in meta_ws[1]])
     if not mapping:
-        meta_ws.cell(1, 1, "Location")
-        meta_ws.cell(1, 2, "Sha256")
-        meta_ws.cell(1, 3, "Size")
-        mapping = {"Location": 1, "Sha256": 2, "Size": 3}
-    elif "Size" not in mapping:
-        # Migrate a workbook written before sizes were recorded.
-        col = meta_ws.max_column + 1
-        meta_ws.cell(1, col, "Size")
-        mapping["Size"] = col
+        for idx, name in enumerate(META_COLUMNS, start=1):
+            meta_ws.cell(1, idx, name)
+            mapping[name] = idx
+    else:
+        # Migrate a workbook written before sizes / modification times were recorded.
+        for name in ("Size", "Mtime"):
+            if name not in mapping:
+                col = meta_ws.max_column + 1
+                meta_ws.cell(1, col, name)
+                mapping[name] = col
     return mapping
 
 
+def _optional_int(raw: object) -> Optional[int]:
+    try:
+        return int(raw) if raw is not None and str(raw).strip() != "" else None
+    except (TypeError, ValueError):
+        return None
+
+
 def _read_meta(meta_ws: Worksheet) -> Dict[str, MetaEntry]:
     mapping = _meta_headers(meta_ws)
-    size_col = mapping.get("Size")
+    return _meta_from_values(meta_ws.iter_rows(min_row=2, values_only=True), mapping)
+
+
+def _write_meta(meta_ws: Worksheet, meta: Dict[str, MetaEntry]) -> bool:
+    """Overwrite the meta rows in place, sorted by location, and drop any left over.
+
+    Reusing the existing rows avoids ``delete_rows`` shifting every cell of the sheet;
+    only rows beyond the new end are deleted. Returns True if the sheet changed.
+    """
+    old_max_col = meta_ws.max_column
+    mapping = _meta_headers(meta_ws)
+    old_max_row = meta_ws.max_row
+    max_col = meta_ws.max_column
+    changed = max_col != old_max_col
+    loc_col, sha_col, size_col, mtime_col = (mapping[name] for name in META_COLUMNS)
+    # write deterministic
+    for i, loc in enumerate(sorted(meta.keys(), key=str.lower), start=2):
+        entry = meta[loc]
+        values: Dict[int, object] = {
+            loc_col: loc,
+            sha_col: entry.sha256,
+            size_col: entry.size,
+            mtime_col: entry.mtime_ns,
+        }
+        # a reused row is cleared across its full width, a new row only needs its values
+        cols = range(1, max_col + 1) if i <= old_max_row else values
+        for col in cols:
+            cell = meta_ws.cell(i, col)
+            value = values.get(col)
+            if cell.value != value:
+                cell.value = value
+                changed = True
+    if old_max_row > len(meta) + 1:
+        meta_ws.delete_rows(len(meta) + 2, old_max_row - len(meta) - 1)
+        changed = True
+    return changed
+
+
+def _value_at(values: Sequence[object], mapping: Dict[str, int], name: str) -> object:
+    """Return the value under header ``name``, or None if the column or cell is absent."""
+    col = mapping.get(name)
+    if col is None or col > len(values):
+        return None
+    return values[col - 1]
+
+
+def _rows_from_values(
+    values_rows: Iterable[Sequence[object]],
+    mapping: Dict[str, int],
+    link_targets: Dict[int, Optional[str]],
+) -> Dict[str, Dict[str, object]]:
+    """Build existing rows keyed by Location from main-sheet data rows (row 2 onwards).
+
+    ``link_targets`` maps a 1-based sheet row to the hyperlink target of its Link cell.
+    """
+    rows: Dict[str, Dict[str, object]] = {}
+    for r, values in enumerate(values_rows, start=2):
+        loc = _value_at(values, mapping, "Location")
+        if not loc:
+            continue
+        row_data: Dict[str, object] = {"__row": r}
+        for name in REQUIRED_COLUMNS:
+            row_data[name] = _value_at(values, mapping, name)
+        if r in link_targets:
+            row_data["__link_target"] = link_targets[r]
+        rows[str(loc)] = row_data
+    return rows
+
+
+def _meta_from_values(values_rows: Iterable[Sequence[object]], mapping: Dict[str, int]) -> Dict[str, MetaEntry]:
+    """Build fingerprints keyed by Location from meta-sheet data rows (row 2 onwards)."""
     out: Dict[str, MetaEntry] = {}
-    for r in range(2, meta_ws.max_row + 1):
-        loc = meta_ws.cell(r, mapping["Location"]).value
+    for values in values_rows:
+        loc = _value_at(values, mapping, "Location")
         if not loc:
             continue
-        sha = meta_ws.cell(r, mapping["Sha256"]).value
-        size: Optional[int] = None
-        if size_col is not None:
-            raw = meta_ws.cell(r, size_col).value
-            try:
-                size = int(raw) if raw is not None and str(raw).strip() != "" else None
-            except (TypeError, ValueError):
-                size = None
-        out[str(loc)] = MetaEntry(str(sha) if sha is not None else None, size)
+        sha = _value_at(values, mapping, "Sha256")
+        size = _optional_int(_value_at(values, mapping, "Size"))
+        mtime_ns = _optional_int(_value_at(values, mapping, "Mtime"))
+        out[str(loc)] = MetaEntry(str(sha) if sha is not None else None, size, mtime_ns)
     return out
 
 
-def _write_meta(meta_ws: Worksheet, meta: Dict[str, MetaEntry]) -> None:
-    mapping = _meta_headers(meta_ws)
-    # clear old
-    if meta_ws.max_row > 1:
-        meta_ws.delete_rows(2, meta_ws.max_row - 1)
-    # write deterministic
-    for i, loc in enumerate(sorted(meta.keys(), key=lambda s: s.lower()), start=2):
-        entry = meta[loc]
-        meta_ws.cell(i, mapping["Location"], loc)
-        meta_ws.cell(i, mapping["Sha256"], entry.sha256)
-        meta_ws.cell(i, mapping["Size"], entry.size)
+_XLSX_MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_XLSX_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_XLSX_PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+
+def _package_rels(archive: zipfile.ZipFile, part: str) -> Dict[str, str]:
+    """Return relationship id -> absolute part name (or external URL) for an xlsx part."""
+    folder, name = posixpath.split(part)
+    try:
+        root = ET.fromstring(archive.read(posixpath.join(folder, "_rels", name + ".rels")))
+    except KeyError:
+        return {}
+    rels: Dict[str, str] = {}
+    for rel in root.iter(_XLSX_PKG_REL_NS + "Relationship"):
+        target = rel.get("Target") or ""
+        if rel.get("TargetMode") != "External":
+            target = target[1:] if target.startswith("/") else posixpath.normpath(posixpath.join(folder, target))
+        rels[rel.get("Id") or ""] = target
+    return rels
+
+
+def _read_link_targets(xlsx_path: Path, sheet_title: str, column: int) -> Dict[int, Optional[str]]:
+    """Return sheet row -> hyperlink target for one column of a sheet.
+
+    Read-only workbooks do not bind hyperlinks to cells, so the targets are read from
+    the sheet part and its relationships directly.
+    """
+    links: Dict[int, Optional[str]] = {}
+    with zipfile.ZipFile(xlsx_path) as archive:
+        workbook_part = next(
+            (t for t in _package_rels(archive, "").values() if t.endswith("workbook.xml")), "xl/workbook.xml"
+        )
+        workbook_root = ET.fromstring(archive.read(workbook_part))
+        rel_id = next(
+            (
+                sheet.get(_XLSX_REL_NS + "id")
+                for sheet in workbook_root.iter(_XLSX_MAIN_NS + "sheet")
+                if sheet.get("name") == sheet_title
+            ),
+            None,
+        )
+        sheet_part = _package_rels(archive, workbook_part).get(rel_id or "")
+        if sheet_part is None:
+            return links
+        sheet_rels = _package_rels(archive, sheet_part)
+        with archive.open(sheet_part) as src:
+            for _event, element in ET.iterparse(src):
+                if element.tag == _XLSX_MAIN_NS + "row":
+                    element.clear()
+                elif element.tag == _XLSX_MAIN_NS + "hyperlink":
+                    target = sheet_rels.get(element.get(_XLSX_REL_NS + "id") or "")
+                    if target is None:
+                        continue
+                    for cells in rows_from_range(element.get("ref") or ""):
+                        for coordinate in cells:
+                            row, col = coordinate_to_tuple(coordinate)
+                            if col == column:
+                                links[row] = target
+    return links
+
+
+def _load_existing_data(output_xlsx: Path) -> Tuple[Dict[str, Dict[str, object]], Dict[str, MetaEntry]]:
+    """Read existing rows and fingerprints from a workbook that will not be written back.
+
+    The workbook is opened read-only, which streams cell values and skips styles; this
+    is enough for dry runs and JSON/CSV export.
+    """
+    try:
+        wb = load_workbook(output_xlsx, read_only=True)
+    except PermissionError:
+        _logger.warning(
+            "Cannot open %s (locked/open in Excel). Cannot preserve existing Description values.",
+            output_xlsx,
+        )
+        return {}, {}
+
+    try:
+        ws = wb[MAIN_SHEET_NAME] if MAIN_SHEET_NAME in wb.sheetnames else wb.active
+        values_rows = ws.iter_rows(values_only=True)
+        mapping = _header_mapping(next(values_rows, ()))
+        existing_rows: Dict[str, Dict[str, object]] = {}
+        if "Location" in mapping:
+            link_targets = _read_link_targets(output_xlsx, ws.title, mapping["Link"]) if "Link" in mapping else {}
+            existing_rows = _rows_from_values(values_rows, mapping, link_targets)
+
+        meta: Dict[str, MetaEntry] = {}
+        if META_SHEET_NAME in wb.sheetnames:
+            meta_rows = wb[META_SHEET_NAME].iter_rows(values_only=True)
+            meta_mapping = _header_mapping(next(meta_rows, ()))
+            meta = _meta_from_values(meta_rows, meta_mapping)
+    finally:
+        wb.close()
+    return existing_rows, meta
 
 
 def _parse_version(v: object) -> Tuple[int, int]:
@@ -743,22 +1250,113 @@ def _set_link_cell(cell: Cell, target: str, text: str) -> None:
     cell.style = "Hyperlink"
 
 
-def _row_to_dict(row: Dict[str, object]) -> Dict[str, object]:
-    """Convert internal row representation to a clean dict for JSON/CSV export."""
-    result = {}
+def _link_for_row(row: Dict[str, object], existing: Dict[str, object]) -> Tuple[Optional[str], object]:
+    """Return (hyperlink target or None, displayed value) for a row's Link cell."""
+    link = row.get("Link")
+    if isinstance(link, dict) and link.get("target"):
+        return link["target"], link.get("text") or row.get("File Name", "")
+    # Preserve an existing hyperlink if present and rule says "no other change"
+    if "__link_target" in existing and existing.get("Link"):
+        return str(existing["__link_target"]), str(existing["Link"])
+    return None, row.get("Link", "")
+
+
+def _display_len(value: object) -> int:
+    """Characters ``value`` takes up in the sheet; dates show as dd/mm/yyyy."""
+    return len("dd/mm/yyyy") if isinstance(value, date) else len(str(value))
+
+
+def _write_new_workbook(
+    output_xlsx: Path,
+    updated_rows: Dict[str, Dict[str, object]],
+    meta: Dict[str, MetaEntry],
+    max_width: int = 80,
+) -> Path:
+    """Write a treasure map from scratch through a write-only workbook.
+
+    Only used when there is no existing workbook to preserve, so rows can be streamed
+    with ``append`` instead of being set cell by cell. Column widths are measured while
+    the rows are built, because a write-only sheet cannot be read back.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(MAIN_SHEET_NAME)
+    ws.freeze_panes = "A2"
+
+    widths = {name: len(name) for name in REQUIRED_COLUMNS}
+    rows: List[Tuple[bool, List[Tuple[Optional[str], object]]]] = []
+    for loc in sorted(updated_rows.keys(), key=str.lower):
+        row = updated_rows[loc]
+        values: List[Tuple[Optional[str], object]] = []
+        for col_name in REQUIRED_COLUMNS:
+            target: Optional[str] = None
+            if col_name == "Link":
+                target, value = _link_for_row(row, {})
+            else:
+                value = row.get(col_name, "")
+            if value is not None:
+                widths[col_name] = max(widths[col_name], _display_len(value))
+            values.append((target, value))
+        rows.append((row.get("Status") == STATUS_BROKEN, values))
+
+    # Dimensions are emitted with the first row, so they must be set before any append.
+    for col_idx, name in enumerate(REQUIRED_COLUMNS, start=1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = min(widths[name] + 2, max_width)
+
+    header_font = Font(bold=True)
+    header = []
+    for name in REQUIRED_COLUMNS:
+        cell = WriteOnlyCell(ws, name)
+        cell.font = header_font
+        header.append(cell)
+    ws.append(header)
+
+    for is_broken, values in rows:
+        cells = []
+        for col_name, (target, value) in zip(REQUIRED_COLUMNS, values, strict=True):
+            cell = WriteOnlyCell(ws)
+            if target:
+                _set_link_cell(cell, target, str(value))
+            else:
+                cell.value = value
+            if is_broken:
+                cell.fill = BROKEN_FILL
+                cell.font = BROKEN_FONT
+            if col_name in ("Date Found", "Last Seen") and isinstance(value, date):
+                cell.number_format = "dd/mm/yyyy"
+            cells.append(cell)
+        ws.append(cells)
+
+    meta_ws = wb.create_sheet(META_SHEET_NAME)
+    meta_ws.sheet_state = "hidden"
+    meta_ws.append(META_COLUMNS)
+    for loc in sorted(meta.keys(), key=str.lower):
+        entry = meta[loc]
+        meta_ws.append([loc, entry.sha256, entry.size, entry.mtime_ns])
+
+    return _safe_save_workbook(wb, output_xlsx)
+
+
+def _row_to_tuple(row: Dict[str, object]) -> Tuple[object, ...]:
+    """Convert internal row representation to clean export values, in REQUIRED_COLUMNS order."""
+    result: List[object] = []
     for col in REQUIRED_COLUMNS:
         val = row.get(col)
         if col == "Link":
             # Extract URL from link dict
             if isinstance(val, dict):
-                result[col] = val.get("target", "")
+                result.append(val.get("target", ""))
             else:
-                result[col] = str(val) if val else ""
+                result.append(str(val) if val else "")
         elif isinstance(val, date):
-            result[col] = val.isoformat()
+            result.append(val.isoformat())
         else:
-            result[col] = val if val is not None else ""
-    return result
+            result.append(val if val is not None else "")
+    return tuple(result)
+
+
+def _row_to_dict(row: Dict[str, object]) -> Dict[str, object]:
+    """Convert internal row representation to a clean dict for JSON export."""
+    return dict(zip(REQUIRED_COLUMNS, _row_to_tuple(row), strict=True))
 
 
 def _write_json(output_path: Path, rows: Dict[str, Dict[str, object]]) -> Path:
@@ -766,10 +1364,18 @@ def _write_json(output_path: Path, rows: Dict[str, Dict[str, object]]) -> Path:
     output_path = output_path.resolve()
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    data = {"treasure_map": [_row_to_dict(rows[loc]) for loc in sorted(rows.keys(), key=lambda s: s.lower())]}
+    data = {"treasure_map": [_row_to_dict(rows[loc]) for loc in sorted(rows.keys(), key=str.lower)]}
 
-    with output_path.open("w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    # orjson produces the same text as json.dumps(indent=2, ensure_ascii=False), faster.
+    blob: Optional[bytes] = None
+    if _orjson is not None:
+        try:
+            blob = _orjson.dumps(data, option=_orjson.OPT_INDENT_2)
+        except TypeError:  # e.g. an integer wider than 64 bits; json copes
+            blob = None
+    if blob is None:
+        blob = json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+    output_path.write_bytes(blob)
 
     return output_path
 
@@ -780,10 +1386,9 @@ def _write_csv(output_path: Path, rows: Dict[str, Dict[str, object]]) -> Path:
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
     with output_path.open("w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=REQUIRED_COLUMNS)
-        writer.writeheader()
-        for loc in sorted(rows.keys(), key=lambda s: s.lower()):
-            writer.writerow(_row_to_dict(rows[loc]))
+        writer = csv.writer(f)
+        writer.writerow(REQUIRED_COLUMNS)
+        writer.writerows(_row_to_tuple(rows[loc]) for loc in sorted(rows.keys(), key=str.lower))
 
     return output_path
 
@@ -868,7 +1473,7 @@ def _detect_moves(
             "text": f.filename,
         }
         updated_rows[f.rel_location] = row
-        meta[f.rel_location] = MetaEntry(f.sha256, f.size)
+        meta[f.rel_location] = MetaEntry(f.sha256, f.size, f.mtime_ns)
         moves.append((old_loc, f.rel_location))
         scan_result.moved_files.append((old_loc, f.rel_location))
         scan_result.changes.append(
@@ -1052,7 +1657,7 @@ def _repair_link_targets(
     scan_result : ScanResult
         Accumulating scan record; repaired locations are appended to it.
     """
-    for loc in sorted(updated_rows, key=lambda s: s.lower()):
+    for loc in sorted(updated_rows, key=str.lower):
         found_file = found_by_location.get(loc)
         if found_file is None:
             continue
@@ -1079,6 +1684,105 @@ def _repair_link_targets(
         scan_result.changes.append(FileChange(loc, ChangeType.REPAIRED))
 
 
+def _cell_shows(cell: Cell, value: object, target: Optional[str]) -> bool:
+    """True if ``cell`` already holds ``value`` and links to ``target`` (None: no link)."""
+    current = cell.value
+    # dates are stored as serial numbers and load back as midnight datetimes
+    if isinstance(current, datetime) and type(value) is date and current.time() == datetime.min.time():
+        current = current.date()
+    # openpyxl saves "" as an empty cell, which loads back as None
+    if current not in (None, "") or value not in (None, ""):
+        if current != value:
+            return False
+    link = cell.hyperlink
+    return (link.target if link else None) == target
+
+
+def _rewrite_main_sheet(
+    ws: Worksheet,
+    mapping: Dict[str, int],
+    updated_rows: Dict[str, Dict[str, object]],
+    existing_rows: Dict[str, Dict[str, object]],
+    max_width: int = 80,
+) -> bool:
+    """Bring the data rows of a loaded main sheet up to date, sorted by Location.
+
+    Rows are updated in place and a cell is only written when its value, hyperlink or
+    Broken highlighting changes, so a re-scan with few changes writes few cells. Rows
+    past the new end are deleted. Column widths are measured as the rows are visited,
+    not by re-reading the sheet. Returns True if the sheet changed.
+    """
+    changed = False
+    widths = {name: len(name) for name in REQUIRED_COLUMNS}
+    old_max_row = ws.max_row
+    status_col = mapping["Status"]
+    required_cols = {mapping[name] for name in REQUIRED_COLUMNS}
+    # Other columns are not carried along when rows move, so clear them as a full rewrite would.
+    other_cols = [col for col in range(1, ws.max_column + 1) if col not in required_cols]
+    # Loop invariants: (name, column index, is a date column) per required column.
+    columns = [(name, mapping[name], name in ("Date Found", "Last Seen")) for name in REQUIRED_COLUMNS]
+
+    # Keep deterministic ordering by Location
+    for row_idx, loc in enumerate(sorted(updated_rows.keys(), key=str.lower), start=2):
+        row = updated_rows[loc]
+        is_broken = row.get("Status") == STATUS_BROKEN
+        # Formatting follows the Status already at this index, so an unchanged cell can
+        # only be skipped while the row keeps the same highlighting.
+        restyle = row_idx > old_max_row or (ws.cell(row=row_idx, column=status_col).value == STATUS_BROKEN) != is_broken
+        for col_name, col_idx, is_date_col in columns:
+            c = ws.cell(row=row_idx, column=col_idx)
+            target: Optional[str] = None
+            if col_name == "Link":
+                target, value = _link_for_row(row, existing_rows.get(loc, {}))
+                if target:
+                    value = str(value)
+            else:
+                value = row.get(col_name, "")
+            if value is not None:
+                widths[col_name] = max(widths[col_name], _display_len(value))
+            if not restyle and _cell_shows(c, value, target):
+                continue
+
+            changed = True
+            if target:
+                _set_link_cell(c, target, str(value))
+            else:
+                if c.hyperlink:
+                    c.hyperlink = None
+                    c.style = "Normal"
+                c.value = value
+
+            # Rows are rewritten in place, so formatting must be reset or a
+            # previously-broken row keeps its red fill at that index.
+            if is_broken:
+                c.fill = BROKEN_FILL
+                c.font = BROKEN_FONT
+            else:
+                c.fill = DEFAULT_FILL
+                if col_name != "Link":
+                    c.font = Font()
+            if is_date_col and isinstance(value, date):
+                c.number_format = "dd/mm/yyyy"
+
+        if row_idx <= old_max_row:
+            for col in other_cols:
+                c = ws.cell(row=row_idx, column=col)
+                if c.value is not None:
+                    c.value = None
+                    changed = True
+
+    if old_max_row > len(updated_rows) + 1:
+        ws.delete_rows(len(updated_rows) + 2, old_max_row - len(updated_rows) - 1)
+        changed = True
+
+    for name, width in widths.items():
+        dim = ws.column_dimensions[get_column_letter(mapping[name])]
+        if dim.width != min(width + 2, max_width):
+            dim.width = min(width + 2, max_width)
+            changed = True
+    return changed
+
+
 def create_or_update_treasure_map(
     *,
     root_dir: Path,
@@ -1092,6 +1796,8 @@ def create_or_update_treasure_map(
     progress_callback: Optional[Callable[[str], None]] = None,
     detect_moves: bool = True,
     with_result: bool = False,
+    jobs: Optional[int] = None,
+    rehash: bool = False,
 ) -> Path | ScanResult | WriteOutcome:
     """Scan root_dir and create/update the treasure map.
 
@@ -1121,6 +1827,13 @@ def create_or_update_treasure_map(
     with_result : bool, default False
         If True, a non-dry run returns a :class:`WriteOutcome` carrying both the
         written path and the :class:`ScanResult`, instead of the path alone.
+    jobs : int or None, optional
+        Threads used to walk and hash the tree; ``None`` picks a default from the CPU
+        count. Passed to :func:`discover_documents` as ``max_workers``.
+    rehash : bool, default False
+        If True, read and hash every file even when its size and modification time
+        match the previous scan. Use it after restoring files with preserved
+        timestamps, or on filesystems whose modification times cannot be trusted.
 
     Returns
     -------
@@ -1135,27 +1848,50 @@ def create_or_update_treasure_map(
     _logger.info("DOF %s", __version__)
     _logger.info("Scanning %s", root_dir)
 
-    found = discover_documents(root_dir, suffixes=suffixes, progress_callback=progress_callback)
+    # Without a loaded workbook (none exists yet, or it is locked) a new one is streamed
+    # out at the end.
+    existing_rows: Dict[str, Dict[str, object]] = {}
+    meta: Dict[str, MetaEntry] = {}
+    wb: Optional[Workbook] = None
+    ws = None
+    meta_ws = None
+    # headers or sheets were added to a loaded workbook, so it must be saved
+    layout_changed = False
+    mapping = {col: i + 1 for i, col in enumerate(REQUIRED_COLUMNS)}
+    if output_xlsx.exists() and (dry_run or output_format != OutputFormat.XLSX):
+        # The workbook is only read, never written back, so skip the full load.
+        existing_rows, meta = _load_existing_data(output_xlsx)
+    elif output_xlsx.exists():
+        loaded = _load_existing_workbook(output_xlsx)
+        if loaded is not None:
+            wb, ws, meta_ws, layout_changed = loaded
+            header_cols = ws.max_column
+            mapping = _ensure_required_headers(ws)
+            layout_changed = _style_header(ws, mapping) or layout_changed or ws.max_column != header_cols
+            existing_rows = _read_existing_rows(ws, mapping)
+            meta = _read_meta(meta_ws)
+
+    hash_algorithm = _select_hash_algorithm(meta)
+    _logger.debug("Fingerprinting with %s (sha256 backend: %s)", hash_algorithm, _sha256_backend())
+
+    # Read once: the scan skips ignored files and the same rules drop ignored rows below.
+    ignore_rules = _load_treasureignore(root_dir) or []
+
+    # Recorded fingerprints let unchanged files skip re-hashing.
+    found = discover_documents(
+        root_dir,
+        suffixes=suffixes,
+        progress_callback=progress_callback,
+        max_workers=jobs,
+        known=None if rehash else meta,
+        hash_algorithm=hash_algorithm,
+        ignore_rules=ignore_rules,
+    )
     _logger.info("Found %d document(s)", len(found))
 
     # Track changes for dry-run reporting
     scan_result = ScanResult(total_found=len(found))
 
-    # For JSON/CSV with no existing file, we don't need to load a workbook
-    if output_format != OutputFormat.XLSX and not output_xlsx.exists():
-        existing_rows: Dict[str, Dict[str, object]] = {}
-        meta: Dict[str, MetaEntry] = {}
-        wb = None
-        ws = None
-        meta_ws = None
-        mapping = {col: i + 1 for i, col in enumerate(REQUIRED_COLUMNS)}
-    else:
-        wb, ws, meta_ws = _load_or_create_workbook(output_xlsx)
-        mapping = _ensure_required_headers(ws)
-        _style_header(ws, mapping)
-        existing_rows = _read_existing_rows(ws, mapping)
-        meta = _read_meta(meta_ws)
-
     # We'll build a new in-memory table of rows, preserving existing rows + appending new ones.
     updated_rows: Dict[str, Dict[str, object]] = dict(existing_rows)
 
@@ -1180,7 +1916,7 @@ def create_or_update_treasure_map(
 
             # identical (including both None) -> no change (except Last Seen)
             if prev_sha == f.sha256:
-                meta[loc] = MetaEntry(f.sha256, f.size)
+                meta[loc] = MetaEntry(f.sha256, f.size, f.mtime_ns)
                 scan_result.unchanged_files.append(loc)
                 scan_result.changes.append(FileChange(loc, ChangeType.UNCHANGED, old_version, old_version))
                 continue
@@ -1189,14 +1925,17 @@ def create_or_update_treasure_map(
             if _hash_changed(prev_sha, f.sha256):
                 new_version = _bump_version(row.get("Version"))
                 row["Version"] = new_version
-                meta[loc] = MetaEntry(f.sha256, f.size)
+                meta[loc] = MetaEntry(f.sha256, f.size, f.mtime_ns)
                 scan_result.updated_files.append(loc)
                 scan_result.changes.append(FileChange(loc, ChangeType.UPDATED, old_version, new_version))
                 continue
 
-            # Previously unreadable/unhashed but now readable -> record hash, no bump
-            if prev_sha is None and f.sha256 is not None:
-                meta[loc] = MetaEntry(f.sha256, f.size)
+            # Previously unreadable/unhashed, or hashed with another algorithm, but
+            # readable now -> record the new hash, no bump
+            if f.sha256 is not None and (
+                prev_sha is None or _hash_algorithm_of(prev_sha) != _hash_algorithm_of(f.sha256)
+            ):
+                meta[loc] = MetaEntry(f.sha256, f.size, f.mtime_ns)
                 scan_result.unchanged_files.append(loc)
                 scan_result.changes.append(FileChange(loc, ChangeType.UNCHANGED, old_version, old_version))
                 continue
@@ -1238,15 +1977,15 @@ def create_or_update_treasure_map(
             "Status": STATUS_OK,
             "Previous Location": "",
         }
-        meta[loc] = MetaEntry(f.sha256, f.size)
+        meta[loc] = MetaEntry(f.sha256, f.size, f.mtime_ns)
         scan_result.new_files.append(loc)
         scan_result.changes.append(FileChange(loc, ChangeType.NEW, None, "1.0"))
 
     # If a .treasureignore exists, treat ignored files as out-of-scope and remove them.
-    ignore_rules_map = _load_treasureignore(root_dir)
-    if ignore_rules_map:
+    if ignore_rules:
+        is_ignored = _ignore_matcher(ignore_rules)
         for loc in list(updated_rows.keys()):
-            if _is_ignored(str(loc).replace("\\", "/"), ignore_rules_map):
+            if is_ignored(str(loc).replace("\\", "/")):
                 updated_rows.pop(loc, None)
                 meta.pop(loc, None)
                 scan_result.ignored_files.append(loc)
@@ -1272,7 +2011,7 @@ def create_or_update_treasure_map(
     )
 
     # Final pass: settle Status for every surviving row (all formats, dry runs included).
-    for loc in sorted(updated_rows, key=lambda s: s.lower()):
+    for loc in sorted(updated_rows, key=str.lower):
         row = updated_rows[loc]
         if row.get("Previous Location") is None:
             row["Previous Location"] = ""
@@ -1307,55 +2046,18 @@ def create_or_update_treasure_map(
         _logger.info("Wrote %s", written)
         return WriteOutcome(written, scan_result) if with_result else written
 
-    # XLSX format - need workbook
+    # XLSX: stream a brand-new workbook, or rewrite the loaded one in place
     if wb is None:
-        wb, ws, meta_ws = _load_or_create_workbook(output_xlsx)
-        mapping = _ensure_required_headers(ws)
-        _style_header(ws, mapping)
-
-    # Rewrite the main sheet (keeps it clean + deterministic)
-    if ws.max_row > 1:
-        ws.delete_rows(2, ws.max_row - 1)
-
-    # Keep deterministic ordering by Location
-    for row_idx, loc in enumerate(sorted(updated_rows.keys(), key=lambda s: s.lower()), start=2):
-        row = updated_rows[loc]
-        is_broken = row.get("Status") == STATUS_BROKEN
-        for col_name in REQUIRED_COLUMNS:
-            c = ws.cell(row=row_idx, column=mapping[col_name])
-            if col_name == "Link":
-                link = row.get("Link")
-                if isinstance(link, dict) and link.get("target"):
-                    _set_link_cell(c, link["target"], link.get("text") or row.get("File Name", ""))
-                else:
-                    # Preserve an existing hyperlink if present and rule says "no other change"
-                    existing = existing_rows.get(loc, {})
-                    if "__link_target" in existing and existing.get("Link"):
-                        _set_link_cell(c, existing["__link_target"], str(existing["Link"]))
-                    else:
-                        c.value = row.get("Link", "")
-            else:
-                c.value = row.get(col_name, "")
-
-            # Rows are rewritten in place, so formatting must be reset every run or a
-            # previously-broken row keeps its red fill at that index.
-            if is_broken:
-                c.fill = BROKEN_FILL
-                c.font = BROKEN_FONT
-            else:
-                c.fill = DEFAULT_FILL
-                if col_name != "Link":
-                    c.font = Font()
-
-        for col_name in ("Date Found", "Last Seen"):
-            dcell = ws.cell(row=row_idx, column=mapping[col_name])
-            if isinstance(dcell.value, date):
-                dcell.number_format = "dd/mm/yyyy"
-
-    _autosize_columns(ws, mapping)
-    _write_meta(meta_ws, meta)
-
-    written = _safe_save_workbook(wb, output_xlsx)
+        written = _write_new_workbook(output_xlsx, updated_rows, meta)
+    else:
+        changed = _rewrite_main_sheet(ws, mapping, updated_rows, existing_rows)
+        changed = _write_meta(meta_ws, meta) or changed
+        if changed or layout_changed:
+            written = _safe_save_workbook(wb, output_xlsx)
+        else:
+            # Nothing differs from the file on disk, so skip re-serializing it.
+            _logger.info("%s is already up to date", output_xlsx)
+            written = output_xlsx
     _logger.info("Wrote %s", written)
 
     if written != output_xlsx:
@@ -1379,6 +2081,8 @@ def dof_api(
     progress_callback: Optional[Callable[[str], None]] = None,
     detect_moves: bool = True,
     with_result: bool = False,
+    jobs: Optional[int] = None,
+    rehash: bool = False,
 ) -> Path | ScanResult | WriteOutcome:
     """CLI-friendly wrapper around :func:`create_or_update_treasure_map`.
 
@@ -1390,6 +2094,10 @@ def dof_api(
         If True, relink rows whose file has moved or been renamed.
     with_result : bool, default False
         If True, a non-dry run returns a :class:`WriteOutcome` instead of a path.
+    jobs : int or None, optional
+        Scan and hashing threads; ``None`` picks a default from the CPU count.
+    rehash : bool, default False
+        If True, re-read every file instead of trusting unchanged size and mtime.
 
     Returns
     -------
@@ -1407,4 +2115,6 @@ def dof_api(
         progress_callback=progress_callback,
         detect_moves=detect_moves,
         with_result=with_result,
+        jobs=jobs,
+        rehash=rehash,
     )
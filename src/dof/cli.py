@@ -110,6 +110,20 @@ class ProgressCounter:
     default=True,
     help="Show progress during scan.",
 )
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=None,
+    show_default="CPU count x 2, max 32",
+    help="Threads used to scan and hash files (1 = sequential).",
+)
+@click.option(
+    "--rehash",
+    is_flag=True,
+    default=False,
+    help="Re-read every file, even if its size and modification time are unchanged.",
+)
 def cli(
     loglevel: Optional[int],
     root_dir: Path,
@@ -121,6 +135,8 @@ def cli(
     dry_run: bool,
     output_format: str,
     progress: bool,
+    jobs: Optional[int],
+    rehash: bool,
 ):
     """Build/update a document "treasure map" Excel workbook."""
     # Convert format string to enum
@@ -140,6 +156,8 @@ def cli(
         progress_callback=progress_counter,
         detect_moves=not no_detect_moves,
         with_result=True,
+        jobs=jobs,
+        rehash=rehash,
     )
 
     progress_counter.finish()
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import csv
 import json
+import zipfile
 from pathlib import Path
 
 import pytest
@@ -27,7 +28,7 @@ def _locations(out: Path) -> set:
     wb = load_workbook(out)
     ws = wb[api.MAIN_SHEET_NAME]
     col = _headers(ws)["Location"]
-    return {ws.cell(r, col).value for r in range(2, ws.max_row + 1)}
+    return {loc for (loc,) in ws.iter_rows(min_row=2, min_col=col, max_col=col, values_only=True)}
 
 
 def test_cli_creates_output(tmp_path: Path) -> None:
@@ -39,7 +40,9 @@ def test_cli_creates_output(tmp_path: Path) -> None:
     runner = CliRunner()
     res = runner.invoke(cli, ["-d", str(root), "-o", str(out)])
     assert res.exit_code == 0
-    assert out.exists()
+    # A structural probe is enough here; the values are covered by the unit tests.
+    with zipfile.ZipFile(out) as zf:
+        assert "xl/worksheets/sheet1.xml" in zf.namelist()
 
 
 def test_cli_keep_missing_flag(tmp_path: Path) -> None:
@@ -334,3 +337,39 @@ def test_c10_repaired_section_sits_between_ignored_and_broken(tmp_path: Path) ->
     assert "* keep.pdf" in res.output
     assert "! gone.docx" in res.output
     assert res.output.index("Repaired links:") < res.output.index("Broken links:")
+
+
+def test_cli_jobs_option_writes_the_same_rows(tmp_path: Path) -> None:
+    """--jobs only changes the thread count; the map lists the same documents."""
+    root = tmp_path / "root"
+    for i in range(6):
+        _write(root / f"d{i % 3}" / f"f{i}.pdf", b"%PDF-1.4\n" + bytes([i]))
+
+    runner = CliRunner()
+    locations = []
+    for jobs in ("1", "4"):
+        out = tmp_path / f"out{jobs}.xlsx"
+        res = runner.invoke(cli, ["-d", str(root), "-o", str(out), "--jobs", jobs])
+        assert res.exit_code == 0, res.output
+        locations.append(_locations(out))
+    assert locations[0] == locations[1]
+    assert len(locations[0]) == 6
+
+
+def test_cli_jobs_rejects_zero(tmp_path: Path) -> None:
+    res = CliRunner().invoke(cli, ["-d", str(tmp_path), "--jobs", "0"])
+    assert res.exit_code == 2
+    assert "--jobs" in res.output
+
+
+def test_cli_rehash_flag_rereads_files(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    root = tmp_path / "root"
+    _write(root / "a.pdf", b"A")
+    out = tmp_path / "out.xlsx"
+    runner = CliRunner()
+    assert runner.invoke(cli, ["-d", str(root), "-o", str(out)]).exit_code == 0
+
+    seen = []
+    monkeypatch.setattr(api, "discover_documents", lambda *a, **kw: seen.append(kw["known"]) or [])
+    assert runner.invoke(cli, ["-d", str(root), "-o", str(out), "--rehash", "--dry-run"]).exit_code == 0
+    assert seen == [None]
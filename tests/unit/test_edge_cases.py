@@ -6,12 +6,17 @@ Tests for:
 - JSON output format
 - CSV output format
 - Progress callback
+- Directory traversal
+- Parallel hashing
+- Existing workbook that cannot be opened
+- Locked destination on save
 - Unreadable .treasureignore handling
 - Symlink handling
 """
 
 from __future__ import annotations
 
+import codecs
 import csv
 import json
 from datetime import date
@@ -21,6 +26,7 @@ from unittest.mock import Mock
 import pytest
 from openpyxl import load_workbook
 
+from dof import api
 from dof.api import (
     MAIN_SHEET_NAME,
     ChangeType,
@@ -30,12 +36,27 @@ from dof.api import (
     discover_documents,
 )
 
+UTF8_BOM_IGNORE = codecs.BOM_UTF8 + b"ignore.pdf\n"
+UTF16_LE_BOM_IGNORE = codecs.BOM_UTF16_LE + "ignore.pdf\n".encode("utf-16-le")
+UTF16_BE_BOM_IGNORE = codecs.BOM_UTF16_BE + "ignore.pdf\n".encode("utf-16-be")
+INVALID_UTF8 = b"\x80\x81\x82\xff\xfe"
+
 
 def _write(p: Path, content: bytes) -> None:
     p.parent.mkdir(parents=True, exist_ok=True)
     p.write_bytes(content)
 
 
+def _locations(out: Path) -> set:
+    """Location column (8) of every data row, streamed from a read-only load."""
+    wb = load_workbook(out, read_only=True)
+    try:
+        ws = wb[MAIN_SHEET_NAME]
+        return {loc for (loc,) in ws.iter_rows(min_row=2, min_col=8, max_col=8, values_only=True)}
+    finally:
+        wb.close()
+
+
 class TestUnicodeFilenames:
     """Test handling of Unicode filenames with special characters."""
 
@@ -50,9 +71,7 @@ class TestUnicodeFilenames:
         out = tmp_path / "map.xlsx"
         create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=date(2025, 12, 18))
 
-        wb = load_workbook(out)
-        ws = wb[MAIN_SHEET_NAME]
-        locs = {ws.cell(r, 8).value for r in range(2, ws.max_row + 1)}
+        locs = _locations(out)
 
         assert "日本語.pdf" in locs
         assert "中文文档.docx" in locs
@@ -67,9 +86,7 @@ class TestUnicodeFilenames:
             out = tmp_path / "map.xlsx"
             create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=date(2025, 12, 18))
 
-            wb = load_workbook(out)
-            ws = wb[MAIN_SHEET_NAME]
-            locs = {ws.cell(r, 8).value for r in range(2, ws.max_row + 1)}
+            locs = _locations(out)
             assert "report_📊.pdf" in locs
         except OSError:
             pytest.skip("Filesystem does not support emoji in filenames")
@@ -84,9 +101,7 @@ class TestUnicodeFilenames:
         out = tmp_path / "map.xlsx"
         create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=date(2025, 12, 18))
 
-        wb = load_workbook(out)
-        ws = wb[MAIN_SHEET_NAME]
-        locs = {ws.cell(r, 8).value for r in range(2, ws.max_row + 1)}
+        locs = _locations(out)
 
         assert "文档/report.pdf" in locs
         assert "données/fichier.txt" in locs
@@ -210,6 +225,24 @@ class TestOutputFormats:
         assert "Version" in entry
         assert "Location" in entry
 
+    def test_json_output_same_with_and_without_orjson(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """orjson, when installed, must write exactly what the stdlib encoder writes."""
+        pytest.importorskip("orjson")
+        root = tmp_path / "root"
+        _write(root / "résumé.pdf", b"pdf content")
+        _write(root / "sub" / "doc2.txt", b"text content")
+
+        def export(name: str) -> bytes:
+            result = create_or_update_treasure_map(
+                root_dir=root, output_xlsx=tmp_path / name, today=date(2025, 12, 18), output_format=OutputFormat.JSON
+            )
+            assert isinstance(result, Path)
+            return result.read_bytes()
+
+        fast = export("fast.xlsx")
+        monkeypatch.setattr(api, "_orjson", None)
+        assert export("stdlib.xlsx") == fast
+
     def test_csv_output(self, tmp_path: Path) -> None:
         """Test CSV output format."""
         root = tmp_path / "root"
@@ -230,14 +263,15 @@ class TestOutputFormats:
 
         with result.open(encoding="utf-8") as f:
             reader = csv.DictReader(f)
-            rows = list(reader)
+            first = next(reader)
+            remaining = sum(1 for _ in reader)
 
-        assert len(rows) == 2
+        assert 1 + remaining == 2
 
         # Check header fields
-        assert "File Name" in rows[0]
-        assert "File Type" in rows[0]
-        assert "Date Found" in rows[0]
+        assert "File Name" in first
+        assert "File Type" in first
+        assert "Date Found" in first
 
     def test_json_with_unicode(self, tmp_path: Path) -> None:
         """Test JSON output handles Unicode correctly."""
@@ -271,10 +305,9 @@ class TestOutputFormats:
         )
 
         with result.open(encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            rows = list(reader)
+            first = next(csv.DictReader(f))
 
-        assert rows[0]["File Name"] == "données.pdf"
+        assert first["File Name"] == "données.pdf"
 
 
 class TestProgressCallback:
@@ -297,15 +330,109 @@ class TestProgressCallback:
         root = tmp_path / "root"
         _write(root / "doc.pdf", b"content")
 
-        paths_received = []
+        callback = Mock()
+        discover_documents(root, progress_callback=callback)
 
-        def callback(path: str) -> None:
-            paths_received.append(path)
+        received = [c.args[0] for c in callback.call_args_list]
+        assert len(received) == 1
+        assert "doc.pdf" in received[0]
 
-        discover_documents(root, progress_callback=callback)
 
-        assert len(paths_received) == 1
-        assert "doc.pdf" in paths_received[0]
+class TestTraversal:
+    """Test the scandir-based walk against Path.walk() and its threaded variant."""
+
+    def test_walk_matches_path_walk(self, tmp_path: Path) -> None:
+        root = tmp_path / "root"
+        for rel in ("a.pdf", "sub/b.PDF", "sub/deeper/c.docx", "other/.hidden/d.txt", "other/e.bin"):
+            _write(root / rel, b"x")
+        (root / "empty").mkdir()
+
+        expected = [dirpath / name for dirpath, _dirs, files in root.walk() for name in files]
+        assert [Path(e.path) for e in api._walk_files(str(root))] == expected
+
+    def test_parallel_walk_keeps_serial_order(self, tmp_path: Path) -> None:
+        root = tmp_path / "root"
+        for i in range(5):
+            for j in range(3):
+                _write(root / f"d{i}" / f"s{j}" / f"f{j}.pdf", b"x")
+            _write(root / f"d{i}" / "top.pdf", b"x")
+        _write(root / "root.pdf", b"x")
+
+        serial = [e.path for e in api._walk_files(str(root))]
+        assert [e.path for e in api._walk_files_parallel(str(root), 4)] == serial
+
+        calls: list[str] = []
+        discover_documents(root, progress_callback=calls.append, max_workers=4)
+        assert len(calls) == 21
+
+    def test_suffix_rules_match_pathlib(self, tmp_path: Path) -> None:
+        root = tmp_path / "root"
+        for name in (".pdf", "doc.", "doc.PDF", "archive.tar.pdf", "noext"):
+            _write(root / name, b"x")
+
+        for name in (".pdf", "doc.", "doc.PDF", "archive.tar.pdf", "noext"):
+            assert api._suffix_of(name) == Path(name).suffix.lower()
+        assert [f.rel_location for f in discover_documents(root)] == ["archive.tar.pdf", "doc.PDF"]
+
+
+class TestParallelHashing:
+    """Test that hashing on a thread pool matches a sequential scan."""
+
+    def test_worker_count_does_not_change_results(self, tmp_path: Path) -> None:
+        root = tmp_path / "root"
+        for i in range(12):
+            _write(root / f"sub{i % 3}" / f"doc{i}.pdf", f"content {i}".encode())
+
+        sequential = discover_documents(root, max_workers=1)
+        parallel = discover_documents(root, max_workers=4)
+
+        assert parallel == sequential
+        assert [f.rel_location for f in parallel] == sorted(f.rel_location for f in parallel)
+        assert all(f.sha256 for f in parallel)
+
+
+class TestUnopenableWorkbook:
+    """Test that a workbook which cannot be opened is replaced by a new one."""
+
+    def test_permission_error_writes_new_workbook(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        root = tmp_path / "root"
+        _write(root / "doc.pdf", b"content")
+        out = tmp_path / "map.xlsx"
+        create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=date(2025, 1, 1))
+
+        def locked(*args: object, **kwargs: object) -> None:
+            raise PermissionError("locked")
+
+        monkeypatch.setattr(api, "load_workbook", locked)
+        result = create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=date(2025, 1, 2), with_result=True)
+        monkeypatch.undo()
+
+        assert result.scan.new_files == ["doc.pdf"]
+        ws = load_workbook(result.path)[MAIN_SHEET_NAME]
+        assert ws.cell(2, 1).value == "doc.pdf"
+        assert ws.cell(2, 6).hyperlink is not None
+
+
+class TestLockedDestination:
+    """Test the *.NEW.xlsx fallback when the destination cannot be replaced."""
+
+    def test_locked_destination_writes_new_file(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        root = tmp_path / "root"
+        _write(root / "doc.pdf", b"content")
+        out = tmp_path / "map.xlsx"
+        real_replace = api.os.replace
+
+        def replace(src: str, dst: Path) -> None:
+            if Path(dst) == out:
+                raise PermissionError("locked")
+            real_replace(src, dst)
+
+        monkeypatch.setattr(api.os, "replace", replace)
+        written = create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=date(2025, 1, 1))
+
+        assert written == tmp_path / "map.NEW.xlsx"
+        assert load_workbook(written)[MAIN_SHEET_NAME].cell(2, 1).value == "doc.pdf"
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["map.NEW.xlsx", "root"]
 
 
 class TestSymlinks:
@@ -328,9 +455,7 @@ class TestSymlinks:
         out = tmp_path / "map.xlsx"
         create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=date(2025, 12, 18))
 
-        wb = load_workbook(out)
-        ws = wb[MAIN_SHEET_NAME]
-        locs = {ws.cell(r, 8).value for r in range(2, ws.max_row + 1)}
+        locs = _locations(out)
 
         assert "link.pdf" in locs
 
@@ -351,9 +476,7 @@ class TestSymlinks:
         out = tmp_path / "map.xlsx"
         create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=date(2025, 12, 18))
 
-        wb = load_workbook(out)
-        ws = wb[MAIN_SHEET_NAME]
-        locs = {ws.cell(r, 8).value for r in range(2, ws.max_row + 1)}
+        locs = _locations(out)
 
         assert "linked_dir/doc.pdf" in locs
 
@@ -361,25 +484,23 @@ class TestSymlinks:
 class TestTreasureignoreEdgeCases:
     """Edge cases for .treasureignore handling."""
 
-    def test_treasureignore_with_bom(self, tmp_path: Path) -> None:
-        """Test .treasureignore file with UTF-8 BOM is handled."""
+    @pytest.mark.parametrize("payload", [UTF8_BOM_IGNORE, UTF16_LE_BOM_IGNORE, UTF16_BE_BOM_IGNORE])
+    def test_treasureignore_with_bom(self, tmp_path: Path, payload: bytes) -> None:
+        """Test .treasureignore file with a UTF-8 or UTF-16 BOM is handled."""
         root = tmp_path / "root"
         _write(root / "ignore.pdf", b"ignore")
         _write(root / "keep.pdf", b"keep")
 
-        # Write file with UTF-8 BOM
-        ignore_file = root / ".treasureignore"
-        ignore_file.write_bytes(b"\xef\xbb\xbfignore.pdf\n")
+        (root / ".treasureignore").write_bytes(payload)
 
         out = tmp_path / "map.xlsx"
         create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=date(2025, 12, 18))
 
-        wb = load_workbook(out)
-        ws = wb[MAIN_SHEET_NAME]
-        locs = {ws.cell(r, 8).value for r in range(2, ws.max_row + 1)}
+        locs = _locations(out)
 
         # File should still be ignored despite BOM (pattern after BOM stripping)
         assert "keep.pdf" in locs
+        assert "ignore.pdf" not in locs
 
     def test_treasureignore_binary_content(self, tmp_path: Path) -> None:
         """Test .treasureignore with binary/invalid UTF-8 content doesn't crash."""
@@ -387,15 +508,13 @@ class TestTreasureignoreEdgeCases:
         _write(root / "doc.pdf", b"content")
 
         # Write binary garbage to .treasureignore
-        (root / ".treasureignore").write_bytes(b"\x80\x81\x82\xff\xfe")
+        (root / ".treasureignore").write_bytes(INVALID_UTF8)
 
         out = tmp_path / "map.xlsx"
         # Should not raise an exception
         create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=date(2025, 12, 18))
 
-        wb = load_workbook(out)
-        ws = wb[MAIN_SHEET_NAME]
-        locs = {ws.cell(r, 8).value for r in range(2, ws.max_row + 1)}
+        locs = _locations(out)
 
         # File should be present since ignore file was unreadable/invalid
         assert "doc.pdf" in locs
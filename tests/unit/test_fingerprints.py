@@ -0,0 +1,275 @@
+"""Fingerprint tests: the per-file hash, size and modification time kept on ``_dof_meta``.
+
+A file whose size and modification time both match the previous scan reuses the
+recorded hash instead of being read again. Anything that contradicts that evidence,
+or a modification time too recent to trust, forces a re-hash.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import time
+from datetime import date
+from pathlib import Path
+from typing import List
+
+import pytest
+from openpyxl import Workbook, load_workbook
+
+from dof import api
+from dof.api import MetaEntry, WriteOutcome, create_or_update_treasure_map, discover_documents
+
+DAY1 = date(2026, 1, 1)
+DAY2 = date(2026, 1, 2)
+
+# Comfortably outside the racy-mtime window.
+OLD_MTIME_NS = 1_600_000_000 * 1_000_000_000
+
+
+def _write(p: Path, content: bytes, *, mtime_ns: int = OLD_MTIME_NS) -> None:
+    p.parent.mkdir(parents=True, exist_ok=True)
+    p.write_bytes(content)
+    os.utime(p, ns=(mtime_ns, mtime_ns))
+
+
+def _scan(root: Path, out: Path, *, day: date = DAY1) -> WriteOutcome:
+    result = create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=day, with_result=True)
+    assert isinstance(result, WriteOutcome)
+    return result
+
+
+@pytest.fixture
+def hashed(monkeypatch: pytest.MonkeyPatch) -> List[str]:
+    """Record the file name of every file that is actually read and hashed."""
+    calls: List[str] = []
+    real = api._content_hash_file
+
+    def spy(path: Path, algorithm: str = api.HASH_SHA256) -> str:
+        calls.append(path.name)
+        return real(path, algorithm)
+
+    monkeypatch.setattr(api, "_content_hash_file", spy)
+    return calls
+
+
+def test_unchanged_file_is_not_rehashed(tmp_path: Path, hashed: List[str]) -> None:
+    root = tmp_path / "root"
+    _write(root / "a.pdf", b"alpha")
+    out = tmp_path / "map.xlsx"
+
+    _scan(root, out)
+    assert hashed == ["a.pdf"]
+
+    hashed.clear()
+    outcome = _scan(root, out, day=DAY2)
+    assert hashed == []
+    assert outcome.scan.unchanged_files == ["a.pdf"]
+
+
+def test_rehash_reads_unchanged_files_and_catches_a_same_stat_edit(tmp_path: Path, hashed: List[str]) -> None:
+    root = tmp_path / "root"
+    _write(root / "a.pdf", b"alpha")
+    out = tmp_path / "map.xlsx"
+    _scan(root, out)
+
+    # Same size and a restored mtime: only a full re-read can see the edit.
+    _write(root / "a.pdf", b"alphA")
+    hashed.clear()
+    assert _scan(root, out, day=DAY2).scan.unchanged_files == ["a.pdf"]
+    assert hashed == []
+
+    result = create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=DAY2, with_result=True, rehash=True)
+    assert isinstance(result, WriteOutcome)
+    assert hashed == ["a.pdf"]
+    assert result.scan.updated_files == ["a.pdf"]
+
+
+def test_changed_mtime_forces_rehash_and_detects_edit(tmp_path: Path, hashed: List[str]) -> None:
+    root = tmp_path / "root"
+    _write(root / "a.pdf", b"alpha")
+    out = tmp_path / "map.xlsx"
+    _scan(root, out)
+
+    # Same size, different bytes: only the modification time gives it away.
+    _write(root / "a.pdf", b"alphA", mtime_ns=OLD_MTIME_NS + 1_000_000_000)
+    hashed.clear()
+    outcome = _scan(root, out, day=DAY2)
+
+    assert hashed == ["a.pdf"]
+    assert outcome.scan.updated_files == ["a.pdf"]
+
+
+def test_recent_mtime_is_not_recorded(tmp_path: Path, hashed: List[str]) -> None:
+    root = tmp_path / "root"
+    _write(root / "a.pdf", b"alpha", mtime_ns=time.time_ns())
+    out = tmp_path / "map.xlsx"
+    _scan(root, out)
+
+    wb = load_workbook(out)
+    meta_ws = wb[api.META_SHEET_NAME]
+    headers = {c.value: c.column for c in meta_ws[1]}
+    assert meta_ws.cell(2, headers["Mtime"]).value is None
+
+    # An unrecorded mtime can never vouch for the file, so it is read again.
+    hashed.clear()
+    _scan(root, out, day=DAY2)
+    assert hashed == ["a.pdf"]
+
+
+def test_known_entry_without_hash_is_rehashed(tmp_path: Path, hashed: List[str]) -> None:
+    root = tmp_path / "root"
+    _write(root / "a.pdf", b"alpha")
+
+    known = {"a.pdf": MetaEntry(None, 5, OLD_MTIME_NS)}
+    (found,) = discover_documents(root, known=known)
+
+    assert hashed == ["a.pdf"]
+    assert found.sha256 is not None
+    assert found.mtime_ns == OLD_MTIME_NS
+
+
+def test_workbook_without_mtime_column_is_migrated(tmp_path: Path, hashed: List[str]) -> None:
+    root = tmp_path / "root"
+    _write(root / "a.pdf", b"alpha")
+    out = tmp_path / "map.xlsx"
+    _scan(root, out)
+
+    # Simulate a workbook written before modification times were recorded.
+    wb = load_workbook(out)
+    meta_ws = wb[api.META_SHEET_NAME]
+    headers = {c.value: c.column for c in meta_ws[1]}
+    meta_ws.delete_cols(headers["Mtime"])
+    wb.save(out)
+
+    hashed.clear()
+    outcome = _scan(root, out, day=DAY2)
+    assert hashed == ["a.pdf"]
+    assert outcome.scan.unchanged_files == ["a.pdf"]
+
+    wb = load_workbook(out)
+    meta_ws = wb[api.META_SHEET_NAME]
+    headers = {c.value: c.column for c in meta_ws[1]}
+    assert meta_ws.cell(2, headers["Mtime"]).value == OLD_MTIME_NS
+
+
+def _meta_hashes(out: Path) -> List[str]:
+    wb = load_workbook(out)
+    meta_ws = wb[api.META_SHEET_NAME]
+    headers = {c.value: c.column for c in meta_ws[1]}
+    return [str(meta_ws.cell(r, headers["Sha256"]).value) for r in range(2, meta_ws.max_row + 1)]
+
+
+def test_new_workbook_without_blake3_uses_sha256(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(api, "_blake3", None)
+    root = tmp_path / "root"
+    _write(root / "a.pdf", b"alpha")
+    out = tmp_path / "map.xlsx"
+    _scan(root, out)
+
+    (sha,) = _meta_hashes(out)
+    assert len(sha) == 64 and not sha.startswith(api.BLAKE3_PREFIX)
+
+
+def test_new_workbook_with_blake3_uses_blake3(tmp_path: Path) -> None:
+    pytest.importorskip("blake3")
+    root = tmp_path / "root"
+    _write(root / "a.pdf", b"alpha")
+    out = tmp_path / "map.xlsx"
+    _scan(root, out)
+    assert _meta_hashes(out)[0].startswith(api.BLAKE3_PREFIX)
+
+    _write(root / "a.pdf", b"alpha, edited", mtime_ns=OLD_MTIME_NS + 1_000_000_000)
+    outcome = _scan(root, out, day=DAY2)
+    assert outcome.scan.updated_files == ["a.pdf"]
+
+
+def test_sha256_workbook_keeps_sha256(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    pytest.importorskip("blake3")
+    root = tmp_path / "root"
+    _write(root / "a.pdf", b"alpha")
+    out = tmp_path / "map.xlsx"
+    with monkeypatch.context() as m:
+        m.setattr(api, "_blake3", None)
+        _scan(root, out)
+
+    # blake3 is importable again, but switching would make every hash incomparable.
+    _write(root / "b.pdf", b"bravo")
+    outcome = _scan(root, out, day=DAY2)
+
+    assert outcome.scan.new_files == ["b.pdf"]
+    assert not any(h.startswith(api.BLAKE3_PREFIX) for h in _meta_hashes(out))
+
+
+def test_blake3_workbook_without_blake3_never_bumps(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    pytest.importorskip("blake3")
+    root = tmp_path / "root"
+    _write(root / "a.pdf", b"alpha")
+    out = tmp_path / "map.xlsx"
+    _scan(root, out)
+
+    monkeypatch.setattr(api, "_blake3", None)
+    _write(root / "a.pdf", b"alpha", mtime_ns=OLD_MTIME_NS + 1_000_000_000)
+    outcome = _scan(root, out, day=DAY2)
+
+    # The fingerprints cannot be compared, so no change is claimed; SHA-256 takes over.
+    assert outcome.scan.updated_files == []
+    assert outcome.scan.unchanged_files == ["a.pdf"]
+    assert not _meta_hashes(out)[0].startswith(api.BLAKE3_PREFIX)
+
+
+def test_hashes_from_different_algorithms_never_prove_a_change() -> None:
+    assert not api._hash_changed("ab" * 32, api.BLAKE3_PREFIX + "cd" * 32)
+    assert api._hash_changed("ab" * 32, "cd" * 32)
+
+
+def test_sha256_file_matches_hashlib(tmp_path: Path) -> None:
+    p = tmp_path / "a.pdf"
+    p.write_bytes(b"x" * 3_000_000)
+    assert api._sha256_file(p) == hashlib.sha256(p.read_bytes()).hexdigest()
+    assert api._sha256_backend() in {"openssl", "builtin"}
+
+
+@pytest.mark.parametrize("mmap_fails", [False, True])
+def test_large_file_hash_matches_hashlib(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mmap_fails: bool) -> None:
+    if mmap_fails:
+
+        def _refuse(*args: object, **kwargs: object) -> None:
+            raise OSError("mmap not supported here")
+
+        monkeypatch.setattr(api.mmap, "mmap", _refuse)
+
+    p = tmp_path / "big.pdf"
+    p.write_bytes(bytes(range(256)) * (api.MMAP_HASH_THRESHOLD // 256 + 7))
+    assert api._sha256_file(p) == hashlib.sha256(p.read_bytes()).hexdigest()
+
+
+def test_multithreaded_blake3_digest_matches(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    blake3 = pytest.importorskip("blake3")
+    monkeypatch.setattr(api, "BLAKE3_MULTITHREAD_THRESHOLD", 1024)
+    p = tmp_path / "big.pdf"
+    p.write_bytes(bytes(range(256)) * 64)
+    assert api._blake3_file(p) == api.BLAKE3_PREFIX + blake3.blake3(p.read_bytes()).hexdigest()
+
+
+def test_meta_rows_are_rewritten_in_place() -> None:
+    meta_ws = Workbook().active
+    api._write_meta(
+        meta_ws,
+        {
+            "b.pdf": MetaEntry("sha-b", 2, OLD_MTIME_NS),
+            "a.pdf": MetaEntry("sha-a", 1, OLD_MTIME_NS),
+            "c.pdf": MetaEntry("sha-c", 3, OLD_MTIME_NS),
+        },
+    )
+    meta_ws.cell(3, 6, "stray")
+
+    # Shrinking reuses rows 2-3, clears stale cells and drops the surplus row.
+    api._write_meta(meta_ws, {"c.pdf": MetaEntry("sha-c2", 4, None), "a.pdf": MetaEntry("sha-a", 1, None)})
+
+    rows = [tuple(r) for r in meta_ws.iter_rows(min_row=2, values_only=True)]
+    assert rows == [("a.pdf", "sha-a", 1, None, None, None), ("c.pdf", "sha-c2", 4, None, None, None)]
+    assert api._read_meta(meta_ws) == {
+        "a.pdf": MetaEntry("sha-a", 1, None),
+        "c.pdf": MetaEntry("sha-c2", 4, None),
+    }
@@ -364,10 +364,10 @@ def test_m10_unhashable_file_falls_through_to_tier2(tmp_path: Path, monkeypatch:
     (root / "b").mkdir()
     (root / "a" / "doc.txt").rename(root / "b" / "doc.txt")
 
-    def _no_hash(path: Path) -> Optional[str]:
+    def _no_hash(path: Path, algorithm: str = api.HASH_SHA256) -> Optional[str]:
         return None
 
-    monkeypatch.setattr(api, "_safe_sha256_file", _no_hash)
+    monkeypatch.setattr(api, "_safe_content_hash", _no_hash)
     outcome = _scan(root, out, day=DAY2)
 
     # No Tier 1 evidence (hash is None); Tier 2 still pairs on name+size+type.
@@ -386,7 +386,7 @@ def test_m10b_unhashable_file_with_different_name_does_not_mispair(
     (root / "a" / "doc.txt").unlink()
     _write(root / "b" / "unrelated.txt", b"BBBBBBBB")  # same size, different name
 
-    monkeypatch.setattr(api, "_safe_sha256_file", lambda path: None)
+    monkeypatch.setattr(api, "_safe_content_hash", lambda path, algorithm=api.HASH_SHA256: None)
     outcome = _scan(root, out, day=DAY2)
 
     assert outcome.scan.moved_files == []
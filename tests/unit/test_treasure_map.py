@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import urllib.parse
 from datetime import date
 from pathlib import Path
 
+import pytest
 from openpyxl import load_workbook
 
-from dof.api import MAIN_SHEET_NAME, create_or_update_treasure_map
+from dof import api
+from dof.api import MAIN_SHEET_NAME, ScanResult, create_or_update_treasure_map
 
 
 def _write(p: Path, content: bytes) -> None:
@@ -13,6 +16,29 @@ def _write(p: Path, content: bytes) -> None:
     p.write_bytes(content)
 
 
+def _locations(out: Path) -> set:
+    """Location column (8) of every data row, streamed from a read-only load."""
+    wb = load_workbook(out, read_only=True)
+    try:
+        ws = wb[MAIN_SHEET_NAME]
+        return {loc for (loc,) in ws.iter_rows(min_row=2, min_col=8, max_col=8, values_only=True)}
+    finally:
+        wb.close()
+
+
+def _verify_row(out: Path, location: str, *, date_found: date, last_seen: date, version: str) -> None:
+    """Check one row's dates and Version from a single read-only load of ``out``."""
+    wb = load_workbook(out, read_only=True)
+    try:
+        rows = {row[7]: row for row in wb[MAIN_SHEET_NAME].iter_rows(min_row=2, max_col=8, values_only=True)}
+    finally:
+        wb.close()
+    values = rows[location]
+    assert values[3] is not None and values[3].date() == date_found
+    assert values[4] is not None and values[4].date() == last_seen
+    assert values[6] == version
+
+
 def test_create_and_update_treasure_map(tmp_path: Path) -> None:
     root = tmp_path / "root"
     _write(root / "a.pdf", b"%PDF-1.4\nhello\n")
@@ -46,24 +72,25 @@ def test_create_and_update_treasure_map(tmp_path: Path) -> None:
     assert ws.max_row == 4
 
     # Find row by Location (Location is now column 8)
-    rows = {ws.cell(r, 8).value: r for r in range(2, ws.max_row + 1)}
+    rows = {loc: r for r, (loc,) in enumerate(ws.iter_rows(min_row=2, min_col=8, max_col=8, values_only=True), start=2)}
     assert "a.pdf" in rows
     assert "sub/b.xlsx" in rows
     assert "sub/c.text" in rows
 
     r = rows["a.pdf"]
-    assert ws.cell(r, 1).value == "a.pdf"
-    assert ws.cell(r, 2).value == "PDF"
-    assert (ws.cell(r, 3).value or "") == ""
+    values = next(ws.iter_rows(min_row=r, max_row=r, max_col=8, values_only=True))
+    assert values[0] == "a.pdf"
+    assert values[1] == "PDF"
+    assert (values[2] or "") == ""
 
-    df_cell = ws.cell(r, 4).value
-    ls_cell = ws.cell(r, 5).value
+    df_cell = values[3]
+    ls_cell = values[4]
     assert df_cell is not None
     assert ls_cell is not None
     assert df_cell.date() == d1  # Date Found (first seen)
     assert ls_cell.date() == d1  # Last Seen
 
-    assert ws.cell(r, 7).value == "1.0"  # Version
+    assert values[6] == "1.0"  # Version
 
     link_cell = ws.cell(r, 6)  # Link is now column 6
     assert link_cell.value == "a.pdf"
@@ -79,18 +106,7 @@ def test_create_and_update_treasure_map(tmp_path: Path) -> None:
         sharepoint_base_url="https://sp.example/doclib",
         today=d2,
     )
-    wb2 = load_workbook(out)
-    ws2 = wb2[MAIN_SHEET_NAME]
-    rows2 = {ws2.cell(r, 8).value: r for r in range(2, ws2.max_row + 1)}
-    r2 = rows2["a.pdf"]
-
-    df2 = ws2.cell(r2, 4).value
-    ls2 = ws2.cell(r2, 5).value
-    assert df2 is not None
-    assert ls2 is not None
-    assert df2.date() == d1  # Date Found unchanged
-    assert ls2.date() == d2  # Last Seen updated
-    assert ws2.cell(r2, 7).value == "1.0"  # Version unchanged
+    _verify_row(out, "a.pdf", date_found=d1, last_seen=d2, version="1.0")
 
     # Modify file and re-run:
     # Date Found stays first-seen, Version bumps, Last Seen updates
@@ -103,37 +119,19 @@ def test_create_and_update_treasure_map(tmp_path: Path) -> None:
         today=d3,
     )
 
-    wb3 = load_workbook(out)
-    ws3 = wb3[MAIN_SHEET_NAME]
-    rows3 = {ws3.cell(r, 8).value: r for r in range(2, ws3.max_row + 1)}
-    r3 = rows3["a.pdf"]
+    _verify_row(out, "a.pdf", date_found=d1, last_seen=d3, version="1.1")
 
-    df3 = ws3.cell(r3, 4).value
-    ls3 = ws3.cell(r3, 5).value
-    assert df3 is not None
-    assert ls3 is not None
-    assert df3.date() == d1  # Date Found unchanged
-    assert ls3.date() == d3  # Last Seen updated
-    assert ws3.cell(r3, 7).value == "1.1"  # Version bumped
-
-    # Modify file and re-run:
-    # Date Found stays first-seen, Version bumps, Last Seen updates
-    _write(root / "a.pdf", b"%PDF-1.4\nhello changed\n")
-    d3 = date(2025, 12, 20)
-    create_or_update_treasure_map(
+    # Re-scanning the same content must not bump the Version a second time.
+    result = create_or_update_treasure_map(
         root_dir=root,
         output_xlsx=out,
         sharepoint_base_url="https://sp.example/doclib",
         today=d3,
+        dry_run=True,
     )
-
-    wb3 = load_workbook(out)
-    ws3 = wb3[MAIN_SHEET_NAME]
-    rows3 = {ws3.cell(r, 8).value: r for r in range(2, ws3.max_row + 1)}
-    r3 = rows3["a.pdf"]
-    assert ws3.cell(r3, 4).value.date() == d1  # Date Found unchanged
-    assert ws3.cell(r3, 5).value.date() == d3  # Last Seen updated
-    assert ws3.cell(r3, 7).value == "1.1"  # Version bumped
+    assert isinstance(result, ScanResult)
+    assert result.updated_files == []
+    assert "a.pdf" in result.unchanged_files
 
 
 def test_prune_missing_removes_deleted_files(tmp_path: Path) -> None:
@@ -151,9 +149,7 @@ def test_prune_missing_removes_deleted_files(tmp_path: Path) -> None:
     d2 = date(2025, 12, 19)
     create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=d2, prune_missing=False)
 
-    wb = load_workbook(out)
-    ws = wb[MAIN_SHEET_NAME]
-    locs = {ws.cell(r, 8).value for r in range(2, ws.max_row + 1)}  # Location col 8
+    locs = _locations(out)
     assert "gone.docx" in locs
     assert "keep.pdf" in locs
 
@@ -161,9 +157,7 @@ def test_prune_missing_removes_deleted_files(tmp_path: Path) -> None:
     d3 = date(2025, 12, 20)
     create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=d3, prune_missing=True)
 
-    wb2 = load_workbook(out)
-    ws2 = wb2[MAIN_SHEET_NAME]
-    locs2 = {ws2.cell(r, 8).value for r in range(2, ws2.max_row + 1)}  # Location col 8
+    locs2 = _locations(out)
     assert "gone.docx" not in locs2
     assert "keep.pdf" in locs2
 
@@ -179,9 +173,7 @@ def test_treasureignore_prunes_ignored_files(tmp_path: Path) -> None:
     out = tmp_path / "treasure_map.xlsx"
     create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=date(2025, 12, 18))
 
-    wb = load_workbook(out)
-    ws = wb[MAIN_SHEET_NAME]
-    locs = {ws.cell(r, 8).value for r in range(2, ws.max_row + 1)}  # Location col 8
+    locs = _locations(out)
     assert "keep.pdf" in locs
     assert "ignore.pdf" in locs
 
@@ -191,8 +183,189 @@ def test_treasureignore_prunes_ignored_files(tmp_path: Path) -> None:
 
     create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=date(2025, 12, 19), prune_missing=False)
 
-    wb2 = load_workbook(out)
-    ws2 = wb2[MAIN_SHEET_NAME]
-    locs2 = {ws2.cell(r, 8).value for r in range(2, ws2.max_row + 1)}  # Location col 8
+    locs2 = _locations(out)
     assert "keep.pdf" in locs2
     assert "ignore.pdf" not in locs2
+
+
+def _sheet_snapshot(path: Path) -> list:
+    wb = load_workbook(path)
+    ws = wb[MAIN_SHEET_NAME]
+    cells = [
+        (c.value, c.hyperlink.target if c.hyperlink else None, c.number_format, c.font.b, c.fill.fgColor.rgb)
+        for row in ws.iter_rows()
+        for c in row
+    ]
+    meta = [tuple(c.value for c in row) for row in wb["_dof_meta"].iter_rows()]
+    return [cells, ws.freeze_panes, wb["_dof_meta"].sheet_state, meta]
+
+
+def test_new_workbook_matches_rewritten_workbook(tmp_path: Path) -> None:
+    """The streamed first write and the in-place rewrite produce the same sheet."""
+    root = tmp_path / "root"
+    _write(root / "a.pdf", b"alpha")
+    _write(root / "a fairly long directory name" / "b.docx", b"bravo")
+    out = tmp_path / "treasure_map.xlsx"
+    day = date(2025, 12, 18)
+
+    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=day)
+    fresh = _sheet_snapshot(out)
+    width = load_workbook(out)[MAIN_SHEET_NAME].column_dimensions["H"].width
+    assert width == len("a fairly long directory name/b.docx") + 2
+    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=day)
+
+    assert _sheet_snapshot(out) == fresh
+
+
+def test_rewrite_resizes_columns_to_current_rows(tmp_path: Path) -> None:
+    root = tmp_path / "root"
+    long_name = "a-much-longer-file-name-than-the-header.pdf"
+    _write(root / "a.pdf", b"alpha")
+    out = tmp_path / "treasure_map.xlsx"
+
+    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=date(2025, 12, 18))
+    _write(root / long_name, b"bravo")
+    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=date(2025, 12, 19))
+    assert load_workbook(out)[MAIN_SHEET_NAME].column_dimensions["A"].width == len(long_name) + 2
+
+    (root / long_name).unlink()
+    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=date(2025, 12, 20))
+    assert load_workbook(out)[MAIN_SHEET_NAME].column_dimensions["A"].width == len("File Name") + 2
+
+
+def test_read_only_load_matches_full_load(tmp_path: Path) -> None:
+    """Dry runs and JSON/CSV exports read the workbook read-only; the data must agree."""
+    root = tmp_path / "root"
+    _write(root / "a.pdf", b"alpha")
+    _write(root / "sub" / "b.docx", b"bravo")
+    out = tmp_path / "treasure_map.xlsx"
+    create_or_update_treasure_map(
+        root_dir=root, output_xlsx=out, sharepoint_base_url="https://sp.example/lib", today=date(2025, 12, 18)
+    )
+
+    wb = load_workbook(out)
+    wb[MAIN_SHEET_NAME]["C2"] = "edited by hand"
+    wb.save(out)
+
+    wb = load_workbook(out)
+    ws = wb[MAIN_SHEET_NAME]
+    full_rows = api._read_existing_rows(ws, api._ensure_required_headers(ws))
+    full_meta = api._read_meta(wb[api.META_SHEET_NAME])
+
+    rows, meta = api._load_existing_data(out)
+    assert rows == full_rows
+    assert meta == full_meta
+    assert rows["sub/b.docx"]["__link_target"] == "https://sp.example/lib/sub/b.docx"
+
+
+def _styled_snapshot(path: Path) -> list:
+    ws = load_workbook(path)[MAIN_SHEET_NAME]
+    out = []
+    for row in ws.iter_rows(min_row=2):
+        for c in row:
+            color = c.font.color
+            out.append(
+                (
+                    c.coordinate,
+                    c.value,
+                    c.hyperlink.target if c.hyperlink else None,
+                    c.fill.fgColor.rgb if c.fill.fill_type else None,
+                    color.rgb if color is not None and color.type == "rgb" else None,
+                )
+            )
+    return out
+
+
+def _with_link_dicts(rows: dict) -> dict:
+    """Carry each stored hyperlink on the row itself, as a freshly written workbook needs."""
+    out = {}
+    for loc, row in rows.items():
+        row = dict(row)
+        if "__link_target" in row:
+            row["Link"] = {"target": row.pop("__link_target"), "text": row["Link"]}
+        out[loc] = row
+    return out
+
+
+def test_incremental_rewrite_matches_fresh_write(tmp_path: Path) -> None:
+    """Updating rows in place leaves the same sheet as writing every row from scratch."""
+    root = tmp_path / "root"
+    for name in ("a.pdf", "b.pdf", "c.pdf", "d.pdf"):
+        _write(root / name, name.encode())
+    out = tmp_path / "treasure_map.xlsx"
+    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=date(2025, 12, 18))
+
+    wb = load_workbook(out)
+    ws = wb[MAIN_SHEET_NAME]
+    mapping = api._ensure_required_headers(ws)
+    existing = api._read_existing_rows(ws, mapping)
+    meta = api._read_meta(wb[api.META_SHEET_NAME])
+
+    # Drop a row (shifting the rest up), add one, bump a version and break a link.
+    rows = {loc: row for loc, row in _with_link_dicts(existing).items() if loc != "b.pdf"}
+    rows["c.pdf"]["Version"] = "1.1"
+    rows["c.pdf"]["Last Seen"] = date(2025, 12, 19)
+    rows["d.pdf"]["Status"] = api.STATUS_BROKEN
+    rows["e.pdf"] = dict(rows["a.pdf"], **{"File Name": "e.pdf", "Location": "e.pdf", "Link": "e.pdf"})
+
+    api._rewrite_main_sheet(ws, mapping, rows, existing)
+    wb.save(out)
+    fresh = tmp_path / "fresh.xlsx"
+    api._write_new_workbook(fresh, rows, meta)
+    assert _styled_snapshot(out) == _styled_snapshot(fresh)
+
+    # Healing the link clears the red highlighting again.
+    wb = load_workbook(out)
+    ws = wb[MAIN_SHEET_NAME]
+    existing = api._read_existing_rows(ws, mapping)
+    rows = _with_link_dicts(existing)
+    rows["d.pdf"]["Status"] = api.STATUS_OK
+    api._rewrite_main_sheet(ws, mapping, rows, existing)
+    wb.save(out)
+    api._write_new_workbook(fresh, rows, meta)
+    assert _styled_snapshot(out) == _styled_snapshot(fresh)
+
+
+def test_unchanged_workbook_is_not_saved_again(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    root = tmp_path / "root"
+    _write(root / "a.pdf", b"A")
+    _write(root / "sub" / "b.docx", b"B")
+    out = tmp_path / "treasure_map.xlsx"
+    day = date(2025, 12, 18)
+    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=day)
+
+    saves = []
+    save = api._safe_save_workbook
+    monkeypatch.setattr(api, "_safe_save_workbook", lambda wb, path: saves.append(path) or save(wb, path))
+
+    # Same files, same day: the loaded workbook already matches, so nothing is written.
+    before = out.read_bytes()
+    assert create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=day) == out
+    assert saves == []
+    assert out.read_bytes() == before
+
+    # A new Last Seen date is a change.
+    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=date(2025, 12, 19))
+    assert saves == [out]
+    ws = load_workbook(out)[MAIN_SHEET_NAME]
+    headers = {c.value: c.column for c in ws[1]}
+    assert ws.cell(2, headers["Last Seen"]).value.date() == date(2025, 12, 19)
+
+
+@pytest.mark.parametrize(
+    "rel",
+    ["a.pdf", "sub/dir/b-c_d~e.PDF", "with space.pdf", "naïve/é.docx", "q?#%.pdf", "100%/x.pdf", "a b/c d/e f.pdf"],
+)
+def test_sharepoint_url_fast_path_matches_quoting(rel: str) -> None:
+    base = "https://sp.example/doclib/"
+    expected = "https://sp.example/doclib/" + "/".join(urllib.parse.quote(p) for p in rel.split("/"))
+    assert api._build_sharepoint_url(base, rel, Path(rel)) == expected
+
+
+def test_found_paths_are_resolved_for_local_links(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    _write(tmp_path / "root" / "sub" / "a.pdf", b"A")
+    monkeypatch.chdir(tmp_path)
+
+    (found,) = api.discover_documents(Path("root"))
+    assert found.abs_path == (tmp_path / "root" / "sub" / "a.pdf").resolve()
+    assert api._build_sharepoint_url(None, found.rel_location, found.abs_path) == found.abs_path.resolve().as_uri()
@@ -13,23 +13,13 @@ def _write(p: Path, content: bytes) -> None:
     p.write_bytes(content)
 
 
-def _headers(ws) -> dict[str, int]:
-    """Return mapping header -> 1-based column index."""
-    hdr: dict[str, int] = {}
-    for i, c in enumerate(ws[1], start=1):
-        if c.value:
-            hdr[str(c.value)] = i
-    return hdr
-
-
-def _rows_by_location(ws, loc_col: int) -> dict[str, int]:
-    """Return mapping location string -> row index."""
-    out: dict[str, int] = {}
-    for r in range(2, ws.max_row + 1):
-        v = ws.cell(r, loc_col).value
-        if v:
-            out[str(v)] = r
-    return out
+def _load_sheet(ws) -> tuple[dict[str, int], dict[str, int]]:
+    """Return (header -> 1-based column index, location -> row index) in one pass."""
+    rows = ws.iter_rows(values_only=True)
+    headers = {str(v): i for i, v in enumerate(next(rows, ()), start=1) if v}
+    loc_idx = headers["Location"] - 1
+    locs = {str(r[loc_idx]): i for i, r in enumerate(rows, start=2) if r[loc_idx]}
+    return headers, locs
 
 
 def _cell_date(ws, row: int, col: int) -> date:
@@ -66,7 +56,7 @@ def test_treasure_map_full_lifecycle_create_update_delete(tmp_path: Path) -> Non
 
     wb1 = load_workbook(out)
     ws1 = wb1[MAIN_SHEET_NAME]
-    h1 = _headers(ws1)
+    h1, rows1 = _load_sheet(ws1)
 
     # Required headers present (including new Last Seen)
     assert [ws1.cell(1, i).value for i in range(1, 9)] == [
@@ -80,7 +70,6 @@ def test_treasure_map_full_lifecycle_create_update_delete(tmp_path: Path) -> Non
         "Location",
     ]
 
-    rows1 = _rows_by_location(ws1, h1["Location"])
     assert set(rows1.keys()) == {"a.pdf", "sub/b.xlsx", "sub/c.text"}
 
     r_a_1 = rows1["a.pdf"]
@@ -111,8 +100,7 @@ def test_treasure_map_full_lifecycle_create_update_delete(tmp_path: Path) -> Non
 
     wb2 = load_workbook(out)
     ws2 = wb2[MAIN_SHEET_NAME]
-    h2 = _headers(ws2)
-    rows2 = _rows_by_location(ws2, h2["Location"])
+    h2, rows2 = _load_sheet(ws2)
     r_a_2 = rows2["a.pdf"]
 
     assert _cell_date(ws2, r_a_2, h2["Date Found"]) == d1
@@ -132,8 +120,7 @@ def test_treasure_map_full_lifecycle_create_update_delete(tmp_path: Path) -> Non
 
     wb3 = load_workbook(out)
     ws3 = wb3[MAIN_SHEET_NAME]
-    h3 = _headers(ws3)
-    rows3 = _rows_by_location(ws3, h3["Location"])
+    h3, rows3 = _load_sheet(ws3)
     r_a_3 = rows3["a.pdf"]
 
     assert _cell_date(ws3, r_a_3, h3["Date Found"]) == d1
@@ -156,8 +143,7 @@ def test_treasure_map_full_lifecycle_create_update_delete(tmp_path: Path) -> Non
 
     wb4 = load_workbook(out)
     ws4 = wb4[MAIN_SHEET_NAME]
-    h4 = _headers(ws4)
-    rows4 = _rows_by_location(ws4, h4["Location"])
+    h4, rows4 = _load_sheet(ws4)
 
     assert "sub/b.xlsx" in rows4  # still present in the sheet
     r_b_4 = rows4["sub/b.xlsx"]
@@ -181,8 +167,7 @@ def test_treasure_map_full_lifecycle_create_update_delete(tmp_path: Path) -> Non
 
     wb5 = load_workbook(out)
     ws5 = wb5[MAIN_SHEET_NAME]
-    h5 = _headers(ws5)
-    rows5 = _rows_by_location(ws5, h5["Location"])
+    h5, rows5 = _load_sheet(ws5)
 
     assert "sub/b.xlsx" not in rows5
     assert "a.pdf" in rows5
@@ -226,8 +211,8 @@ def test_treasureignore_directories_files_and_wildcards(tmp_path: Path) -> None:
     create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=date(2025, 12, 18))
     wb1 = load_workbook(out)
     ws1 = wb1[MAIN_SHEET_NAME]
-    h1 = _headers(ws1)
-    locs1 = set(_rows_by_location(ws1, h1["Location"]).keys())
+    _, rows1 = _load_sheet(ws1)
+    locs1 = set(rows1)
 
     assert "keep.pdf" in locs1
     assert "notes.txt" in locs1
@@ -264,8 +249,8 @@ def test_treasureignore_directories_files_and_wildcards(tmp_path: Path) -> None:
 
     wb2 = load_workbook(out)
     ws2 = wb2[MAIN_SHEET_NAME]
-    h2 = _headers(ws2)
-    locs2 = set(_rows_by_location(ws2, h2["Location"]).keys())
+    _, rows2 = _load_sheet(ws2)
+    locs2 = set(rows2)
 
     # Kept
     assert "keep.pdf" in locs2
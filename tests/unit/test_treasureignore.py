@@ -14,10 +14,14 @@ from __future__ import annotations
 from datetime import date
 from pathlib import Path
 
+import pytest
 from openpyxl import load_workbook
 
+from dof import api
 from dof.api import MAIN_SHEET_NAME, create_or_update_treasure_map
 
+_TODAY = date(2025, 12, 18)
+
 
 def _write(p: Path, content: bytes) -> None:
     p.parent.mkdir(parents=True, exist_ok=True)
@@ -25,19 +29,20 @@ def _write(p: Path, content: bytes) -> None:
 
 
 def _get_locations(out: Path) -> set[str]:
-    """Helper to extract all Location values from the treasure map."""
-    wb = load_workbook(out)
-    ws = wb[MAIN_SHEET_NAME]
+    """Helper to extract all Location values from the treasure map, streamed read-only."""
+    wb = load_workbook(out, read_only=True)
+    try:
+        ws = wb[MAIN_SHEET_NAME]
 
-    # Find Location column (should be column 8)
-    loc_col = None
-    for i in range(1, ws.max_column + 1):
-        if ws.cell(1, i).value == "Location":
-            loc_col = i
-            break
-    assert loc_col is not None, "Location column not found"
+        # Find Location column (should be column 8)
+        header = next(ws.iter_rows(max_row=1, values_only=True))
+        assert "Location" in header, "Location column not found"
+        loc_col = header.index("Location") + 1
 
-    return {str(ws.cell(r, loc_col).value) for r in range(2, ws.max_row + 1)}
+        rows = ws.iter_rows(min_row=2, min_col=loc_col, max_col=loc_col, values_only=True)
+        return {str(loc) for (loc,) in rows if loc is not None}
+    finally:
+        wb.close()
 
 
 def test_root_anchored_patterns(tmp_path: Path) -> None:
@@ -54,13 +59,15 @@ def test_root_anchored_patterns(tmp_path: Path) -> None:
     # Root-anchored pattern /exclude.pdf should only ignore at root
     (root / ".treasureignore").write_text("/exclude.pdf\n", encoding="utf-8")
 
-    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=date(2025, 12, 18))
+    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=_TODAY)
     locs = _get_locations(out)
 
-    assert "exclude.pdf" not in locs  # ignored at root
-    assert "keep.pdf" in locs
-    assert "sub/exclude.pdf" in locs  # NOT ignored in subdirectory
-    assert "sub/keep.pdf" in locs
+    # exclude.pdf is ignored at the root only
+    assert locs == {
+        "keep.pdf",
+        "sub/exclude.pdf",  # NOT ignored in subdirectory
+        "sub/keep.pdf",
+    }
 
 
 def test_double_star_patterns(tmp_path: Path) -> None:
@@ -77,13 +84,13 @@ def test_double_star_patterns(tmp_path: Path) -> None:
     # Pattern **/temp/** should match any 'temp' directory at any depth
     (root / ".treasureignore").write_text("**/temp/**\n", encoding="utf-8")
 
-    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=date(2025, 12, 18))
+    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=_TODAY)
     locs = _get_locations(out)
 
-    assert "a/temp/1.pdf" not in locs
-    assert "a/b/temp/2.pdf" not in locs
-    assert "keep/3.pdf" in locs
-    assert "temp.pdf" in locs  # file named temp.pdf, not in temp/ directory
+    assert locs == {
+        "keep/3.pdf",
+        "temp.pdf",  # file named temp.pdf, not in temp/ directory
+    }
 
 
 def test_basename_wildcard_patterns(tmp_path: Path) -> None:
@@ -101,14 +108,10 @@ def test_basename_wildcard_patterns(tmp_path: Path) -> None:
     # Pattern draft.pdf (no /) should match anywhere
     (root / ".treasureignore").write_text("draft.pdf\n", encoding="utf-8")
 
-    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=date(2025, 12, 18))
+    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=_TODAY)
     locs = _get_locations(out)
 
-    assert "draft.pdf" not in locs
-    assert "docs/draft.pdf" not in locs
-    assert "a/b/draft.pdf" not in locs
-    assert "final.pdf" in locs
-    assert "docs/final.pdf" in locs
+    assert locs == {"final.pdf", "docs/final.pdf"}
 
 
 def test_directory_patterns_with_trailing_slash(tmp_path: Path) -> None:
@@ -126,14 +129,13 @@ def test_directory_patterns_with_trailing_slash(tmp_path: Path) -> None:
     # Pattern tmp/ should ignore all tmp directories (at any depth)
     (root / ".treasureignore").write_text("tmp/\n", encoding="utf-8")
 
-    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=date(2025, 12, 18))
+    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=_TODAY)
     locs = _get_locations(out)
 
-    assert "tmp/a.pdf" not in locs
-    assert "tmp/sub/b.pdf" not in locs
-    assert "keep/tmp/c.pdf" not in locs
-    assert "tmp.pdf" in locs  # file, not directory
-    assert "docs/d.pdf" in locs
+    assert locs == {
+        "tmp.pdf",  # file, not directory
+        "docs/d.pdf",
+    }
 
 
 def test_negation_last_match_wins(tmp_path: Path) -> None:
@@ -150,13 +152,10 @@ def test_negation_last_match_wins(tmp_path: Path) -> None:
     # Ignore all .txt but allow important.txt and README.txt back
     (root / ".treasureignore").write_text("*.txt\n!important.txt\n!README.txt\n", encoding="utf-8")
 
-    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=date(2025, 12, 18))
+    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=_TODAY)
     locs = _get_locations(out)
 
-    assert "docs/a.txt" not in locs
-    assert "docs/b.txt" not in locs
-    assert "docs/important.txt" in locs
-    assert "docs/README.txt" in locs
+    assert locs == {"docs/important.txt", "docs/README.txt"}
 
 
 def test_negation_then_ignore_again(tmp_path: Path) -> None:
@@ -171,11 +170,11 @@ def test_negation_then_ignore_again(tmp_path: Path) -> None:
     # Allow secret.pdf, then ignore it again - last match wins
     (root / ".treasureignore").write_text("*.pdf\n!secret.pdf\nsecret.pdf\n", encoding="utf-8")
 
-    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=date(2025, 12, 18))
+    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=_TODAY)
     locs = _get_locations(out)
 
-    assert "docs/secret.pdf" not in locs  # final ignore wins
-    assert "docs/public.pdf" not in locs
+    # docs/secret.pdf is re-included, then ignored again: the final rule wins
+    assert locs == set()
 
 
 def test_comments_and_blank_lines(tmp_path: Path) -> None:
@@ -202,13 +201,13 @@ def test_comments_and_blank_lines(tmp_path: Path) -> None:
         encoding="utf-8",
     )
 
-    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=date(2025, 12, 18))
+    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=_TODAY)
     locs = _get_locations(out)
 
-    assert "a.pdf" not in locs
-    assert "b.pdf" not in locs
-    assert "c.pdf" in locs
-    assert "hash.pdf" in locs  # not ignored by comment
+    assert locs == {
+        "c.pdf",
+        "hash.pdf",  # not ignored by comment
+    }
 
 
 def test_complex_nested_patterns(tmp_path: Path) -> None:
@@ -226,14 +225,14 @@ def test_complex_nested_patterns(tmp_path: Path) -> None:
     # Ignore src/temp and src/cache directories specifically
     (root / ".treasureignore").write_text("src/temp/\nsrc/cache/\n", encoding="utf-8")
 
-    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=date(2025, 12, 18))
+    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=_TODAY)
     locs = _get_locations(out)
 
-    assert "src/temp/file.pdf" not in locs
-    assert "src/cache/file.pdf" not in locs
-    assert "src/main/file.pdf" in locs
-    assert "test/temp/file.pdf" in locs  # different parent path
-    assert "docs/file.pdf" in locs
+    assert locs == {
+        "src/main/file.pdf",
+        "test/temp/file.pdf",  # different parent path
+        "docs/file.pdf",
+    }
 
 
 def test_wildcard_in_directory_name(tmp_path: Path) -> None:
@@ -251,14 +250,13 @@ def test_wildcard_in_directory_name(tmp_path: Path) -> None:
     # Pattern cache* should match directories starting with cache
     (root / ".treasureignore").write_text("cache*/\n", encoding="utf-8")
 
-    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=date(2025, 12, 18))
+    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=_TODAY)
     locs = _get_locations(out)
 
-    assert "cache1/a.pdf" not in locs
-    assert "cache2/b.pdf" not in locs
-    assert "cache_old/c.pdf" not in locs
-    assert "mycache/d.pdf" in locs  # doesn't start with cache
-    assert "data/e.pdf" in locs
+    assert locs == {
+        "mycache/d.pdf",  # doesn't start with cache
+        "data/e.pdf",
+    }
 
 
 def test_pattern_with_multiple_extensions(tmp_path: Path) -> None:
@@ -275,13 +273,10 @@ def test_pattern_with_multiple_extensions(tmp_path: Path) -> None:
     # Ignore specific extensions
     (root / ".treasureignore").write_text("*.txt\n*.docx\n", encoding="utf-8")
 
-    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=date(2025, 12, 18))
+    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=_TODAY)
     locs = _get_locations(out)
 
-    assert "doc1.pdf" in locs
-    assert "doc2.txt" not in locs
-    assert "doc3.docx" not in locs
-    assert "doc4.xlsx" in locs
+    assert locs == {"doc1.pdf", "doc4.xlsx"}
 
 
 def test_subdirectory_specific_pattern(tmp_path: Path) -> None:
@@ -298,13 +293,14 @@ def test_subdirectory_specific_pattern(tmp_path: Path) -> None:
     # Only ignore docs/draft/ specifically, not all draft/ directories
     (root / ".treasureignore").write_text("docs/draft/\n", encoding="utf-8")
 
-    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=date(2025, 12, 18))
+    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=_TODAY)
     locs = _get_locations(out)
 
-    assert "docs/draft/a.pdf" not in locs
-    assert "docs/final/b.pdf" in locs
-    assert "projects/draft/c.pdf" in locs  # different parent
-    assert "draft/d.pdf" in locs  # at root
+    assert locs == {
+        "docs/final/b.pdf",
+        "projects/draft/c.pdf",  # different parent
+        "draft/d.pdf",  # at root
+    }
 
 
 def test_empty_treasureignore_file(tmp_path: Path) -> None:
@@ -318,11 +314,10 @@ def test_empty_treasureignore_file(tmp_path: Path) -> None:
 
     (root / ".treasureignore").write_text("", encoding="utf-8")
 
-    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=date(2025, 12, 18))
+    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=_TODAY)
     locs = _get_locations(out)
 
-    assert "a.pdf" in locs
-    assert "b.pdf" in locs
+    assert locs == {"a.pdf", "b.pdf"}
 
 
 def test_only_comments_treasureignore(tmp_path: Path) -> None:
@@ -336,11 +331,10 @@ def test_only_comments_treasureignore(tmp_path: Path) -> None:
 
     (root / ".treasureignore").write_text("# Just comments\n\n# And blank lines\n  \n", encoding="utf-8")
 
-    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=date(2025, 12, 18))
+    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=_TODAY)
     locs = _get_locations(out)
 
-    assert "a.pdf" in locs
-    assert "b.pdf" in locs
+    assert locs == {"a.pdf", "b.pdf"}
 
 
 def test_whitespace_around_patterns(tmp_path: Path) -> None:
@@ -355,11 +349,10 @@ def test_whitespace_around_patterns(tmp_path: Path) -> None:
     # Pattern with spaces around it
     (root / ".treasureignore").write_text("  ignore.pdf  \n", encoding="utf-8")
 
-    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=date(2025, 12, 18))
+    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=_TODAY)
     locs = _get_locations(out)
 
-    assert "ignore.pdf" not in locs
-    assert "keep.pdf" in locs
+    assert locs == {"keep.pdf"}
 
 
 def test_case_sensitivity(tmp_path: Path) -> None:
@@ -375,7 +368,7 @@ def test_case_sensitivity(tmp_path: Path) -> None:
     # Pattern test.pdf should match exactly (case-sensitive on case-sensitive FS)
     (root / ".treasureignore").write_text("test.pdf\n", encoding="utf-8")
 
-    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=date(2025, 12, 18))
+    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=_TODAY)
     locs = _get_locations(out)
 
     # On case-sensitive filesystems, only test.pdf would be ignored
@@ -397,12 +390,10 @@ def test_deeply_nested_directory_pattern(tmp_path: Path) -> None:
     # Pattern matching deep nesting
     (root / ".treasureignore").write_text("a/b/c/d/e/\n", encoding="utf-8")
 
-    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=date(2025, 12, 18))
+    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=_TODAY)
     locs = _get_locations(out)
 
-    assert "a/b/c/d/e/deep.pdf" not in locs
-    assert "a/b/c/d/shallow.pdf" in locs
-    assert "x/y/z/other.pdf" in locs
+    assert locs == {"a/b/c/d/shallow.pdf", "x/y/z/other.pdf"}
 
 
 def test_question_mark_wildcard(tmp_path: Path) -> None:
@@ -420,14 +411,13 @@ def test_question_mark_wildcard(tmp_path: Path) -> None:
     # Pattern test?.pdf should match test1.pdf, test2.pdf, testa.pdf but not test10.pdf
     (root / ".treasureignore").write_text("test?.pdf\n", encoding="utf-8")
 
-    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=date(2025, 12, 18))
+    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=_TODAY)
     locs = _get_locations(out)
 
-    assert "test1.pdf" not in locs
-    assert "test2.pdf" not in locs
-    assert "testa.pdf" not in locs
-    assert "test10.pdf" in locs  # two characters, not one
-    assert "keep.pdf" in locs
+    assert locs == {
+        "test10.pdf",  # two characters, not one
+        "keep.pdf",
+    }
 
 
 def test_negation_with_whitespace(tmp_path: Path) -> None:
@@ -445,8 +435,112 @@ def test_negation_with_whitespace(tmp_path: Path) -> None:
         encoding="utf-8",
     )
 
-    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=date(2025, 12, 18))
+    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=_TODAY)
     locs = _get_locations(out)
 
-    assert "a.pdf" not in locs
-    assert "b.pdf" in locs  # negation should work despite whitespace
+    assert locs == {"b.pdf"}  # negation should work despite whitespace
+
+
+@pytest.mark.parametrize(
+    ("line", "rel", "expected"),
+    [
+        ("*.pdf", "a/b/c.pdf", True),
+        ("*.pdf", "a.pdf/c.docx", False),
+        ("/*.pdf", "c.pdf", True),
+        ("/*.pdf", "a/c.pdf", False),
+        ("a/*.pdf", "x/a/c.pdf", True),
+        ("a/*.pdf", "a/b/c.pdf", False),
+        ("a/**/c.pdf", "a/b/c.pdf", True),
+        ("a/**/c.pdf", "a/b/d/c.pdf", False),
+        ("tmp/", "x/tmp/y/z.pdf", True),
+        ("tmp/", "x/tmpy/z.pdf", False),
+        ("/docs/", "docs/a.pdf", True),
+        ("docs/tmp/", "docs/tmp/a/b.pdf", False),
+        ("?.pdf", "ab.pdf", False),
+    ],
+)
+def test_rule_regex_matches(line: str, rel: str, expected: bool) -> None:
+    (rule,) = api._parse_treasureignore(line)
+    assert api._is_ignored(rel, [rule]) is expected
+
+
+def test_edited_treasureignore_is_reparsed(tmp_path: Path) -> None:
+    root = tmp_path / "root"
+    root.mkdir()
+    (root / ".treasureignore").write_text("*.pdf\n", encoding="utf-8")
+    assert api._load_treasureignore(root) == [api.IgnoreRule("*.pdf")]
+
+    (root / ".treasureignore").write_text("*.docx\n", encoding="utf-8")
+    assert api._load_treasureignore(root) == [api.IgnoreRule("*.docx")]
+
+
+@pytest.mark.parametrize(
+    ("text", "rel", "expected"),
+    [
+        ("*.pdf\n!keep.pdf\n", "keep.pdf", False),
+        ("*.pdf\n!keep.pdf\n", "drop.pdf", True),
+        ("!keep.pdf\n*.pdf\n", "keep.pdf", True),
+        ("tmp/\n!tmp/keep.pdf\ntmp/keep.pdf\n", "tmp/keep.pdf", True),
+        ("!*.pdf\n", "a.pdf", False),
+    ],
+)
+def test_combined_matcher_last_match_wins(text: str, rel: str, expected: bool) -> None:
+    rules = list(api._parse_treasureignore(text))
+    assert api._ignore_matcher(rules)(rel) is expected
+
+
+@pytest.mark.parametrize(
+    ("text", "rel", "expected"),
+    [
+        ("node_modules/\n", "node_modules", True),
+        ("node_modules/\n", "a/b/node_modules", True),
+        ("node_modules/\n", "node_modules_old", False),
+        ("build*/\n", "src/build-1", True),
+        ("tmp/\n!tmp/keep.pdf\n", "tmp", False),
+        ("!keep.pdf\ntmp/\n", "tmp", True),
+        ("docs/tmp/\n", "docs/tmp", False),
+        ("/tmp/\n", "tmp", False),
+        ("*.pdf\n", "x.pdf", False),
+    ],
+)
+def test_ignored_dir_matcher(text: str, rel: str, expected: bool) -> None:
+    prune = api._ignored_dir_matcher(list(api._parse_treasureignore(text)))
+    assert (prune is not None and prune(rel)) is expected
+
+
+def test_ignored_directories_are_not_walked(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    root = tmp_path / "root"
+    _write(root / "keep.pdf", b"K")
+    _write(root / "node_modules" / "pkg" / "readme.pdf", b"N")
+    _write(root / "src" / "node_modules" / "x.pdf", b"X")
+    _write(root / "src" / "main.pdf", b"M")
+    (root / ".treasureignore").write_text("node_modules/\n", encoding="utf-8")
+
+    listed: list[str] = []
+    list_dir = api._list_dir
+
+    def spy(path: str):
+        listed.append(Path(path).relative_to(root).as_posix())
+        return list_dir(path)
+
+    monkeypatch.setattr(api, "_list_dir", spy)
+    found = api.discover_documents(root, max_workers=1)
+
+    assert [f.rel_location for f in found] == ["keep.pdf", "src/main.pdf"]
+    assert not any("node_modules" in d for d in listed)
+
+
+def test_treasureignore_is_read_once_per_scan(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    root = tmp_path / "root"
+    _write(root / "keep.pdf", b"K")
+    _write(root / "drop.tmp.pdf", b"D")
+    (root / ".treasureignore").write_text("*.tmp.pdf\n", encoding="utf-8")
+
+    loads: list[Path] = []
+    load = api._load_treasureignore
+    monkeypatch.setattr(api, "_load_treasureignore", lambda r: loads.append(r) or load(r))
+
+    out = tmp_path / "out.xlsx"
+    create_or_update_treasure_map(root_dir=root, output_xlsx=out, today=date(2025, 1, 1))
+    assert loads == [root]
+    assert _get_locations(out) == {"keep.pdf"}